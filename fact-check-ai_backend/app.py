@@ -1,8 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from router.fetch_news import fetch_news_router
 from router.auth_router import auth_router
 from router.fact_analysis import fact_analysis_router
+from router.metrics_router import metrics_router
+from utils.metrics import http_request_seconds
+from utils.tracing import TracingMiddleware
+from utils.batch_analysis import start_orphan_sweep
+import time
 
 app = FastAPI()
 
@@ -16,11 +21,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+app.add_middleware(TracingMiddleware)
 
 
 
 app.include_router(fetch_news_router, prefix="/api", tags=["fetch_news"])
 app.include_router(auth_router, prefix="/api", tags=["auth"])
 app.include_router(fact_analysis_router, prefix="/api", tags=["fact_analysis"])
+app.include_router(metrics_router, tags=["metrics"])
+
+
+@app.on_event("startup")
+async def recover_batches():
+    start_orphan_sweep()
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    # Streaming responses are timed until their headers are sent
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        http_request_seconds.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
 
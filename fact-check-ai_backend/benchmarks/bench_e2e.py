@@ -0,0 +1,246 @@
+"""End-to-end load test of the API against local NewsAPI and Perplexity stand-ins.
+
+Boots the fake NewsAPI and Perplexity servers (latency and error distributions from the
+flags below), then the real `app` in one uvicorn worker pointed at them and at a scratch
+Mongo database. After a warm-up that ingests articles and produces a few reports, client
+threads drive a weighted mix of endpoints for --duration seconds. The result is one JSON
+document with throughput and p50/p95/p99 per endpoint plus the API process's peak RSS,
+so runs can be diffed between commits. The scratch database is dropped afterwards.
+
+    python -m benchmarks.bench_e2e --duration 60 --clients 32 --output bench-e2e.json
+    python -m benchmarks.bench_e2e --pplx-latency 2 --pplx-error-rate 0.05 \\
+        --mix get-news-by-topic=10 get-report=10 fact-analysis=2 custom-search=2 fetch-news=1
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+from benchmarks.bench_fact_analysis import percentile, start_fake_server, wait_for_port, local_rate_limits
+
+BENCH_EMAIL = "bench@example.com"
+TOPICS = ["politics", "health", "climate", "economy", "technology"]
+DEFAULT_MIX = ["get-news-by-topic=10", "get-report=10", "fact-analysis=2", "custom-search=2", "fetch-news=1"]
+
+
+class Workload:
+    """Builds requests for each endpoint from the articles and reports seen so far."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.article_ids = []
+        self.reports = []
+        self.lock = threading.Lock()
+
+    def request(self, endpoint):
+        if endpoint == "fetch-news":
+            body = {"country": "us", "topics": [random.choice(TOPICS)], "date_str": "2025-01-01", "page_size": 20}
+            return "POST", "/api/fetch-news", None, body
+        if endpoint == "custom-search":
+            return "POST", "/api/custom-search", None, {"q": random.choice(TOPICS)}
+        if endpoint == "get-news-by-topic":
+            return "GET", "/api/get-news-by-topic", {"topic": random.choice(TOPICS), "limit": 50}, None
+        if endpoint == "fact-analysis":
+            with self.lock:
+                article_id = random.choice(self.article_ids) if self.article_ids else None
+            if article_id is None:
+                return None
+            return "POST", "/api/fact-analysis", {"article_id": article_id, "email": BENCH_EMAIL}, None
+        if endpoint == "get-report":
+            with self.lock:
+                report = random.choice(self.reports) if self.reports else None
+            if report is None:
+                return None
+            return "GET", "/api/get-report", {"report_id": report[1], "article_id": report[0]}, None
+        raise ValueError(f"Unknown endpoint {endpoint}")
+
+    def call(self, endpoint, request=None, timeout=300):
+        request = request or self.request(endpoint)
+        if request is None:
+            return None
+        method, path, params, body = request
+        url = self.base_url + path + ("?" + urllib.parse.urlencode(params) if params else "")
+        data = json.dumps(body).encode() if body is not None else None
+        http_request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(http_request, timeout=timeout) as response:
+                payload = json.loads(response.read() or b"null")
+                status = response.status
+        except urllib.error.HTTPError as e:
+            payload, status = None, e.code
+        except Exception:
+            payload, status = None, 0
+        elapsed = time.perf_counter() - start
+        if endpoint == "fact-analysis" and payload and payload.get("report_id"):
+            with self.lock:
+                self.reports.append((params["article_id"], payload["report_id"]))
+        return status, elapsed
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix:
+        endpoint, _, weight = item.partition("=")
+        weights[endpoint] = float(weight or 1)
+    return weights
+
+
+def peak_rss_mb(pid):
+    # VmHWM is the resident-set high-water mark of the process (Linux only)
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+def warm_up(workload, database, reports):
+    from config.constants import DAILY_ARTICLES
+
+    body = {"country": "us", "topics": TOPICS, "date_str": "2025-01-01", "page_size": 20}
+    workload.call("fetch-news", request=("POST", "/api/fetch-news", None, body))
+    workload.article_ids = [doc["article_id"] for doc in database[DAILY_ARTICLES].find({}, {"article_id": 1}) if doc.get("article_id")]
+    for _ in range(min(reports, len(workload.article_ids))):
+        workload.call("fact-analysis")
+
+
+def drive(workload, weights, clients, duration):
+    endpoints, endpoint_weights = list(weights), list(weights.values())
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        while time.monotonic() < deadline:
+            endpoint = random.choices(endpoints, endpoint_weights)[0]
+            outcome = workload.call(endpoint)
+            if outcome is None:
+                continue
+            status, elapsed = outcome
+            with lock:
+                samples[endpoint].append(elapsed)
+                if not 200 <= status < 300:
+                    errors[endpoint] += 1
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    def summarize(latencies, error_count):
+        return {
+            "requests": len(latencies),
+            "errors": error_count,
+            "throughput_per_s": round(len(latencies) / wall, 2),
+            "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        }
+
+    all_latencies = [latency for latencies in samples.values() for latency in latencies]
+    return {
+        "wall_s": round(wall, 3),
+        "endpoints": {endpoint: summarize(samples[endpoint], errors[endpoint]) for endpoint in endpoints},
+        "total": summarize(all_latencies, sum(errors.values())),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def main(args):
+    from pymongo import MongoClient
+    from config.constants import MONGO_URI
+
+    mongo_client = MongoClient(MONGO_URI)
+    database = mongo_client[args.db_name]
+    news_server = start_fake_server("benchmarks.fake_newsapi", args.news_port, {
+        "FAKE_NEWSAPI_LATENCY": str(args.news_latency),
+        "FAKE_NEWSAPI_TAIL_RATE": str(args.news_tail_rate),
+        "FAKE_NEWSAPI_ERROR_RATE": str(args.news_error_rate),
+    })
+    pplx_server = start_fake_server("benchmarks.fake_perplexity", args.pplx_port, {
+        "FAKE_PPLX_LATENCY": str(args.pplx_latency),
+        "FAKE_PPLX_TAIL_RATE": str(args.pplx_tail_rate),
+        "FAKE_PPLX_ERROR_RATE": str(args.pplx_error_rate),
+    })
+    api_server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(args.port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    results = {
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "rate_limiter")},
+        "rate_limiter": args.rate_limiter,
+    }
+    try:
+        wait_for_port(args.port, timeout=60)
+        workload = Workload(f"http://127.0.0.1:{args.port}")
+        warm_up(workload, database, args.warmup_reports)
+        results.update(drive(workload, parse_mix(args.mix), args.clients, args.duration))
+        results["peak_rss_mb"] = peak_rss_mb(api_server.pid)
+    finally:
+        for server in (api_server, news_server, pplx_server):
+            server.terminate()
+            server.wait()
+        mongo_client.drop_database(args.db_name)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output)
+    print(output)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--mix", nargs="+", default=DEFAULT_MIX, help="endpoint=weight pairs")
+    parser.add_argument("--warmup-reports", type=int, default=5)
+    parser.add_argument("--news-latency", type=float, default=0.3)
+    parser.add_argument("--news-tail-rate", type=float, default=0.0)
+    parser.add_argument("--news-error-rate", type=float, default=0.0)
+    parser.add_argument("--pplx-latency", type=float, default=2.0)
+    parser.add_argument("--pplx-tail-rate", type=float, default=0.0)
+    parser.add_argument("--pplx-error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--news-port", type=int, default=8771)
+    parser.add_argument("--pplx-port", type=int, default=8772)
+    parser.add_argument("--db-name", default="news_db_bench")
+    parser.add_argument("--output", default=None, help="Also write the JSON result to this file")
+    parser.add_argument("--rate-limit", type=float, default=10000, help="Upstream limiter rate and burst for the run (req/s)")
+    args = parser.parse_args()
+
+    # Set before config.constants is imported, and inherited by the API process
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["NEWS_API_BASE"] = f"http://127.0.0.1:{args.news_port}/v2"
+    os.environ["PPLX_API_BASE"] = f"http://127.0.0.1:{args.pplx_port}"
+    args.rate_limiter = local_rate_limits(args.rate_limit)
+    os.environ.setdefault("SECRETS_PROVIDER", "local")
+    if os.environ["SECRETS_PROVIDER"] == "local":
+        os.environ.setdefault("LOCAL_SECRET_JWT_SECRET", "bench-jwt-secret")
+        os.environ.setdefault("LOCAL_SECRET_PERPLEXITY_APIKEY_1", "bench-pplx-key")
+    main(args)
@@ -0,0 +1,148 @@
+"""Load test: does one slow aggregation stall unrelated requests on the same worker?
+
+Seeds a scratch database with articles carrying report entries for one user, boots the API
+in a single uvicorn worker and measures /check-latest-news latency three ways: on its own,
+while clients hammer /fetch-report-summary (async repository), and while they hammer a
+bench-only route running the same pipeline through blocking pymongo, as the endpoint did
+before. The scratch database is dropped afterwards.
+
+    python -m benchmarks.bench_event_loop --articles 20000 --slow-clients 4 --duration 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+
+from benchmarks.bench_fact_analysis import percentile, wait_for_port
+
+BENCH_EMAIL = "bench@example.com"
+
+
+def create_bench_app():
+    # uvicorn --factory entry point: the real app plus the old blocking variant of the summary route
+    from app import app
+    from config.db import daily_articles_collection
+    from utils.repository import report_summary_pipeline
+
+    @app.get("/bench/blocking-report-summary")
+    async def blocking_report_summary(email: str, page: int = 1, page_size: int = 200):
+        entries = list(daily_articles_collection.aggregate(report_summary_pipeline(email, (page - 1) * page_size, page_size)))
+        summaries = [entry for entry in entries[:page_size] if entry.pop("report_found")]
+        return {"status": "success", "articles": summaries, "has_more": len(entries) > page_size}
+
+    return app
+
+
+def seed(database, count):
+    from config.constants import DAILY_ARTICLES, REPORT_COLLECTION
+
+    articles, reports = [], []
+    for idx in range(count):
+        report_id = str(uuid.uuid4())
+        articles.append({
+            "article_id": str(uuid.uuid4()),
+            "title": f"[bench] Synthetic article {idx}",
+            "topic": "bench",
+            "publishedAt": datetime.utcnow(),
+            "article": {"title": f"[bench] Synthetic article {idx}", "description": "Synthetic description " * 10},
+            "reports": [{"report_id": report_id, "analyzed": True, "user_email": BENCH_EMAIL}],
+        })
+        reports.append({
+            "report_id": report_id,
+            "title": f"[bench] Synthetic article {idx}",
+            "summary": {"title": f"[bench] Synthetic article {idx}", "overall_category": "True", "claim_counts": {"True": 3}},
+        })
+    database[DAILY_ARTICLES].insert_many(articles, ordered=False)
+    database[REPORT_COLLECTION].insert_many(reports, ordered=False)
+
+
+def get(url):
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=120) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def measure(base_url, duration, slow_path=None, slow_clients=0):
+    stop = threading.Event()
+    slow_latencies = []
+
+    def slow_client():
+        while not stop.is_set():
+            slow_latencies.append(get(f"{base_url}{slow_path}"))
+
+    threads = [threading.Thread(target=slow_client, daemon=True) for _ in range(slow_clients if slow_path else 0)]
+    for thread in threads:
+        thread.start()
+
+    fast_latencies = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        fast_latencies.append(get(f"{base_url}/api/check-latest-news?topic=bench"))
+        time.sleep(0.01)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "fast_requests": len(fast_latencies),
+        "fast_p50_ms": round(statistics.median(fast_latencies) * 1000, 2),
+        "fast_p95_ms": round(percentile(fast_latencies, 95) * 1000, 2),
+        "fast_p99_ms": round(percentile(fast_latencies, 99) * 1000, 2),
+        "fast_max_ms": round(max(fast_latencies) * 1000, 2),
+        "slow_requests": len(slow_latencies),
+        "slow_p50_ms": round(statistics.median(slow_latencies) * 1000, 2) if slow_latencies else None,
+    }
+
+
+def main(args):
+    from pymongo import MongoClient
+    from config.constants import MONGO_URI
+
+    mongo_client = MongoClient(MONGO_URI)
+    database = mongo_client[args.db_name]
+    seed(database, args.articles)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.bench_event_loop:create_bench_app", "--factory",
+         "--port", str(args.port), "--workers", "1", "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    results = {"articles": args.articles, "slow_clients": args.slow_clients}
+    try:
+        wait_for_port(args.port, timeout=60)
+        base_url = f"http://127.0.0.1:{args.port}"
+        summary_query = f"?email={BENCH_EMAIL}&page={args.page}&page_size=1000"
+        results["idle"] = measure(base_url, args.duration)
+        results["async_summary_load"] = measure(base_url, args.duration, f"/api/fetch-report-summary{summary_query}", args.slow_clients)
+        results["blocking_summary_load"] = measure(base_url, args.duration, f"/bench/blocking-report-summary{summary_query}", args.slow_clients)
+    finally:
+        server.terminate()
+        server.wait()
+        mongo_client.drop_database(args.db_name)
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--slow-clients", type=int, default=4)
+    parser.add_argument("--page", type=int, default=10, help="Deeper pages make the summary aggregation slower")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--db-name", default="news_db_bench")
+    args = parser.parse_args()
+
+    # Must be set before config.constants is imported so neither process touches the real database
+    os.environ["DB_NAME"] = args.db_name
+    os.environ.setdefault("SECRETS_PROVIDER", "local")
+    main(args)
@@ -0,0 +1,105 @@
+"""Benchmark: article ingestion throughput of store_articles.
+
+Generates synthetic NewsAPI articles (with a configurable share of repeated titles) and
+ingests them into a scratch database, comparing the bulk upsert path against the old
+find_one + insert_one loop. The scratch database is dropped afterwards.
+
+    python -m benchmarks.bench_ingest --count 100000 --legacy-count 5000
+"""
+import argparse
+import json
+import os
+import random
+import time
+import uuid
+
+
+def synthetic_articles(count, duplicate_ratio):
+    unique = max(1, int(count * (1 - duplicate_ratio)))
+    titles = [f"Synthetic headline {uuid.uuid4().hex}" for _ in range(unique)]
+    articles = []
+    for idx in range(count):
+        title = titles[idx] if idx < unique else random.choice(titles)
+        articles.append({
+            "source": {"id": None, "name": "Bench Wire"},
+            "author": "Bench Author",
+            "title": title,
+            "description": "Synthetic description used for ingestion benchmarking.",
+            "url": f"https://news.example.com/{uuid.uuid4().hex}",
+            "urlToImage": None,
+            "publishedAt": "2025-01-01T00:00:00Z",
+            "content": "Synthetic content " * 20,
+        })
+    random.shuffle(articles)
+    return articles
+
+
+def legacy_store_articles(collection, date_str, country, topic, articles):
+    for article in articles:
+        title = article.get("title")
+        if not title or collection.find_one({"title": title}):
+            continue
+        collection.insert_one({
+            "article_id": str(uuid.uuid4()),
+            "date": date_str,
+            "country": country,
+            "topic": topic,
+            "article": article,
+            "title": title,
+        })
+
+
+def main(args):
+    from config.db import mongo_client, daily_articles_collection
+    from utils.fetch_news import store_articles
+
+    results = {}
+    try:
+        articles = synthetic_articles(args.count, args.duplicate_ratio)
+        start = time.perf_counter()
+        stats = store_articles("2025-01-01", "us", "bench", articles, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        results["bulk"] = {
+            "articles": args.count,
+            "seconds": round(elapsed, 3),
+            "articles_per_s": round(args.count / elapsed, 1),
+            "inserted": stats["inserted"],
+            "duplicates": stats["duplicates"],
+            "batches": len(stats["batches"]),
+        }
+
+        if args.legacy_count:
+            # Legacy path on an unindexed collection, as it ran before the unique title index
+            legacy_collection = daily_articles_collection.database["daily_articles_legacy_bench"]
+            legacy_articles = synthetic_articles(args.legacy_count, args.duplicate_ratio)
+            start = time.perf_counter()
+            legacy_store_articles(legacy_collection, "2025-01-01", "us", "bench", legacy_articles)
+            elapsed = time.perf_counter() - start
+            results["legacy"] = {
+                "articles": args.legacy_count,
+                "seconds": round(elapsed, 3),
+                "articles_per_s": round(args.legacy_count / elapsed, 1),
+            }
+    finally:
+        mongo_client.drop_database(daily_articles_collection.database.name)
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--legacy-count", type=int, default=5000, help="0 skips the legacy comparison")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--db-name", default="news_db_bench")
+    args = parser.parse_args()
+
+    # Must be set before config.constants is imported so the run never touches the real database
+    os.environ["DB_NAME"] = args.db_name
+    os.environ.setdefault("SECRETS_PROVIDER", "local")
+    if os.environ["SECRETS_PROVIDER"] == "local":
+        os.environ.setdefault("LOCAL_SECRET_JWT_SECRET", "bench-jwt-secret")
+        os.environ.setdefault("LOCAL_SECRET_PERPLEXITY_APIKEY_1", "bench-pplx-key")
+    main(args)
@@ -0,0 +1,68 @@
+"""Benchmark: wall-clock time of fetch_and_store_articles against a local NewsAPI stub.
+
+Runs the same topics x pages workload once with a single worker (the old sequential
+behaviour) and once with the bounded worker pool, into a scratch database that is
+dropped afterwards.
+
+    python -m benchmarks.bench_news_fetch --topics 20 --pages 5 --latency 0.5 --workers 64
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.bench_fact_analysis import start_fake_server, local_rate_limits
+
+
+def run(fetch_and_store_articles, topics, page_size, pages, workers):
+    start = time.perf_counter()
+    stats = fetch_and_store_articles("2025-01-01", "us", topics, page_size, max_pages=pages, max_workers=workers)
+    return {"workers": workers, "seconds": round(time.perf_counter() - start, 3), **stats}
+
+
+def main(args):
+    from config.db import mongo_client, daily_articles_collection
+    from utils.fetch_news import fetch_and_store_articles
+
+    topics = [f"topic{idx}" for idx in range(args.topics)]
+    results = {"single_request_latency_s": args.latency, "rate_limiter": args.rate_limiter}
+    try:
+        results["sequential"] = run(fetch_and_store_articles, topics, args.page_size, args.pages, 1)
+        daily_articles_collection.delete_many({})
+        results["parallel"] = run(fetch_and_store_articles, topics, args.page_size, args.pages, args.workers)
+    finally:
+        mongo_client.drop_database(daily_articles_collection.database.name)
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--db-name", default="news_db_bench")
+    parser.add_argument("--rate-limit", type=float, default=10000, help="Upstream limiter rate and burst for the run (req/s)")
+    args = parser.parse_args()
+
+    os.environ["DB_NAME"] = args.db_name
+    args.rate_limiter = local_rate_limits(args.rate_limit)
+    os.environ["NEWS_API_BASE"] = f"http://127.0.0.1:{args.port}/v2"
+    os.environ["NEWS_FETCH_WORKERS"] = str(args.workers)
+    os.environ.setdefault("SECRETS_PROVIDER", "local")
+    if os.environ["SECRETS_PROVIDER"] == "local":
+        os.environ.setdefault("LOCAL_SECRET_JWT_SECRET", "bench-jwt-secret")
+        os.environ.setdefault("LOCAL_SECRET_PERPLEXITY_APIKEY_1", "bench-pplx-key")
+    server = start_fake_server("benchmarks.fake_newsapi", args.port, {
+        "FAKE_NEWSAPI_LATENCY": str(args.latency),
+        "FAKE_NEWSAPI_TOTAL": str(args.pages * args.page_size),
+    })
+    try:
+        main(args)
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,45 @@
+"""Check: every hot router query in config/indexes.py HOT_QUERIES is planned on an index.
+
+Creates the declared indexes in a scratch database, seeds it with synthetic articles through
+store_articles so the planner works on a populated collection, then explains each hot query
+and exits 1 if any winning plan contains a COLLSCAN. The scratch database is dropped afterwards.
+
+    python -m benchmarks.bench_query_plans --count 20000
+"""
+import argparse
+import json
+import os
+import sys
+
+
+def main(args):
+    from config.db import db, mongo_client
+    from config.indexes import verify_query_plans
+    from utils.fetch_news import store_articles
+    from benchmarks.bench_ingest import synthetic_articles
+
+    try:
+        store_articles("2025-01-01", "us", "bench", synthetic_articles(args.count, 0.0))
+        failures = verify_query_plans(db)
+    finally:
+        mongo_client.drop_database(args.db_name)
+
+    print(json.dumps({"queries_with_collscan": failures}, indent=2))
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--db-name", default="news_db_bench")
+    args = parser.parse_args()
+
+    # Must be set before config.constants is imported so the run never touches the real database;
+    # indexes are built on import of config.db
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["ENSURE_INDEXES_ON_STARTUP"] = "true"
+    os.environ.setdefault("SECRETS_PROVIDER", "local")
+    if os.environ["SECRETS_PROVIDER"] == "local":
+        os.environ.setdefault("LOCAL_SECRET_JWT_SECRET", "bench-jwt-secret")
+        os.environ.setdefault("LOCAL_SECRET_PERPLEXITY_APIKEY_1", "bench-pplx-key")
+    sys.exit(1 if main(args) else 0)
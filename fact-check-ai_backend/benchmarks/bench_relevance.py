@@ -0,0 +1,73 @@
+"""Micro-benchmark: per-article TF-IDF scoring versus one vectorized pass over the page.
+
+Also checks that both scorers agree: the largest score difference and the number of articles
+landing on different sides of the custom-search "similar" threshold are reported, and the run
+exits 1 if the scores diverge or any classification changes.
+
+    python -m benchmarks.bench_relevance --sizes 15 100 1000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.relevance import relevance_scores
+
+WORDS = (
+    "election government minister economy inflation market climate policy court ruling health "
+    "vaccine study report energy oil prices war ceasefire talks technology ai regulation data "
+    "privacy football final record storm flood rescue budget tax reform trade tariffs"
+).split()
+
+
+def synthetic_documents(count, words_per_doc=40):
+    return [" ".join(random.choices(WORDS, k=words_per_doc)) for _ in range(count)]
+
+
+def legacy_scores(query, documents):
+    scores = []
+    for document in documents:
+        tfidf = TfidfVectorizer().fit_transform([query, document])
+        scores.append(cosine_similarity(tfidf[0:1], tfidf[1:2])[0][0] * 100)
+    return scores
+
+
+def timed(func, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15, 100, 1000])
+    parser.add_argument("--query", default="government inflation policy")
+    parser.add_argument("--threshold", type=float, default=60, help="Score at which custom search marks an article similar")
+    args = parser.parse_args()
+
+    diverged = False
+    for size in args.sizes:
+        documents = synthetic_documents(size)
+        legacy = timed(legacy_scores, args.query, documents)
+        vectorized = timed(relevance_scores, args.query, documents)
+        expected = legacy_scores(args.query, documents)
+        actual = relevance_scores(args.query, documents)
+        max_diff = max(abs(old - new) for old, new in zip(expected, actual))
+        flipped = sum((old >= args.threshold) != (new >= args.threshold) for old, new in zip(expected, actual))
+        diverged = diverged or max_diff > 1e-6 or flipped > 0
+        print(json.dumps({
+            "page_size": size,
+            "legacy_ms": round(legacy * 1000, 3),
+            "vectorized_ms": round(vectorized * 1000, 3),
+            "speedup": round(legacy / vectorized, 1),
+            "max_score_diff": float(max_diff),
+            "threshold_flips": int(flipped),
+        }))
+    sys.exit(1 if diverged else 0)
@@ -0,0 +1,47 @@
+"""Latency and error distribution shared by the fake upstream servers.
+
+Each fake reads <PREFIX>_LATENCY, _JITTER (gaussian sd as a share of the latency),
+_TAIL_RATE / _TAIL_FACTOR (share of calls slowed down by the factor) and
+_ERROR_RATE / _ERROR_STATUS (share of calls answered with that status instead) and
+_RATE_LIMIT (requests per second above which calls get a 429 with Retry-After; 0 disables).
+"""
+import math
+import os
+import random
+import time
+
+
+class FaultProfile:
+    def __init__(self, prefix, latency="0.5"):
+        self.latency = float(os.getenv(f"{prefix}_LATENCY", latency))
+        self.jitter = float(os.getenv(f"{prefix}_JITTER", "0.1"))
+        self.tail_rate = float(os.getenv(f"{prefix}_TAIL_RATE", "0"))
+        self.tail_factor = float(os.getenv(f"{prefix}_TAIL_FACTOR", "5"))
+        self.error_rate = float(os.getenv(f"{prefix}_ERROR_RATE", "0"))
+        self.error_status = int(os.getenv(f"{prefix}_ERROR_STATUS", "503"))
+        self.rate_limit = float(os.getenv(f"{prefix}_RATE_LIMIT", "0"))
+        self._tokens = self.rate_limit
+        self._updated_at = time.monotonic()
+        self.throttled = 0
+
+    def sample_latency(self):
+        latency = max(0.0, random.gauss(self.latency, self.latency * self.jitter))
+        if random.random() < self.tail_rate:
+            latency *= self.tail_factor
+        return latency
+
+    def sample_error(self):
+        return self.error_status if random.random() < self.error_rate else None
+
+    def throttle(self):
+        # Provider-side token bucket; returns the Retry-After seconds when the call is over the limit
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._updated_at) * self.rate_limit)
+        self._updated_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+        self.throttled += 1
+        return max(1, math.ceil((1 - self._tokens) / self.rate_limit))
@@ -0,0 +1,55 @@
+"""Local stand-in for the NewsAPI /v2/everything endpoint.
+
+Every request is answered after FAKE_NEWSAPI_LATENCY seconds with a page of synthetic
+articles; totalResults is FAKE_NEWSAPI_TOTAL so clients paginate as they would upstream.
+Latency tails and error rates follow benchmarks.fake_faults with the FAKE_NEWSAPI prefix.
+
+    FAKE_NEWSAPI_LATENCY=0.5 uvicorn benchmarks.fake_newsapi:app --port 8766
+"""
+import asyncio
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from benchmarks.fake_faults import FaultProfile
+
+FAULTS = FaultProfile("FAKE_NEWSAPI", latency="0.5")
+TOTAL_RESULTS = int(os.getenv("FAKE_NEWSAPI_TOTAL", "500"))
+
+app = FastAPI()
+
+
+def fake_article(query, idx):
+    published = datetime.utcnow() - timedelta(minutes=random.randint(0, 60 * 24 * 3))
+    return {
+        "source": {"id": None, "name": "Bench Wire"},
+        "author": f"Author {idx % 17}",
+        "title": f"{query} headline {idx} {uuid.uuid4().hex[:12]}",
+        "description": f"Synthetic {query} story number {idx} for load testing.",
+        "url": f"https://news.example.com/{query}/{uuid.uuid4().hex}",
+        "urlToImage": None,
+        "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "content": f"Synthetic {query} content " * 10,
+    }
+
+
+@app.get("/v2/everything")
+async def everything(q: str = "news", page: int = 1, pageSize: int = 20):
+    retry_after = FAULTS.throttle()
+    if retry_after:
+        return JSONResponse({"status": "error", "code": "rateLimited", "message": "Rate limit exceeded"}, status_code=429, headers={"Retry-After": str(retry_after)})
+    await asyncio.sleep(FAULTS.sample_latency())
+    error_status = FAULTS.sample_error()
+    if error_status:
+        return JSONResponse({"status": "error", "code": "unexpectedError", "message": "Synthetic upstream failure"}, status_code=error_status)
+    start = (page - 1) * pageSize
+    count = max(0, min(pageSize, TOTAL_RESULTS - start))
+    return {
+        "status": "ok",
+        "totalResults": TOTAL_RESULTS,
+        "articles": [fake_article(q, start + idx) for idx in range(count)],
+    }
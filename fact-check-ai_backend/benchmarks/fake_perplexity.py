@@ -0,0 +1,129 @@
+"""Local stand-in for the Perplexity chat completions API.
+
+Answers POST /chat/completions after a configurable delay with a canned response that
+matches whichever schema (ClaimsResponse or SourceResponse) the request asks for. Latency
+tails and error rates follow benchmarks.fake_faults with the FAKE_PPLX prefix.
+
+    FAKE_PPLX_LATENCY=2.0 uvicorn benchmarks.fake_perplexity:app --port 8765
+"""
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.fake_faults import FaultProfile
+
+FAULTS = FaultProfile("FAKE_PPLX", latency="2.0")
+CITATIONS_PER_REPORT = int(os.getenv("FAKE_PPLX_CITATIONS", "6"))
+STREAM_CHUNK_CHARS = int(os.getenv("FAKE_PPLX_STREAM_CHUNK", "40"))
+
+app = FastAPI()
+
+
+def fake_citations():
+    return [f"https://www.example-{idx}.gov/press/{uuid.uuid4().hex[:8]}" for idx in range(CITATIONS_PER_REPORT)]
+
+
+def fake_claims(citations):
+    claims = []
+    for idx, url in enumerate(citations[:3]):
+        claims.append({
+            "claim": f"Synthetic claim number {idx}",
+            "fact_check_category": random.choice(["True", "Misleading", "False", "Unverifiable"]),
+            "sources": [{
+                "source": "official government report",
+                "url": url,
+                "relevant_evidence_excerpt": ["Synthetic evidence excerpt."],
+            }],
+            "raw_content": [f"Raw content for claim {idx}"],
+            "manipuation": {"manipulation_flag": False, "summay": "No manipulation detected."},
+        })
+    return {"claims": claims, "category": "Politics", "overall_category": "True", "notes": "Synthetic report."}
+
+
+def fake_sources(messages):
+    user_prompt = messages[-1].get("content", "") if messages else ""
+    urls = [token.strip("',\"{}[]") for token in user_prompt.split() if token.strip("',\"{}[]").startswith("http")]
+    sources = []
+    for idx, url in enumerate(urls):
+        sources.append({
+            "id": idx,
+            "type": "target" if idx == len(urls) - 1 else "verification",
+            "article_url": url,
+            "source_tier": 1,
+            "content_type": "Government Statements",
+            "domain_name": url.split("/")[2] if url.count("/") >= 2 else url,
+            "publish_time": "2025:01:01 00:00:00.000 UTC",
+            "tonality": {"simplification": 0, "dramatization": 0, "framing_shift": 0, "context_erosion": 0},
+            "authenticity": {
+                "verbatim_match": 0.9,
+                "omission_rate": 0.1,
+                "novelty_ratio": 0.0,
+                "citation_integrity": "Verified",
+                "temporal_consistency": "Valid",
+            },
+            "bias": {"political_leaning": "Neutral", "commercial_interests": False, "institutional_affiliations": []},
+            "bias_summary": "Neutral reporting.",
+        })
+    return {"sources": sources}
+
+
+def completion(payload, content, citations):
+    return {
+        "id": str(uuid.uuid4()),
+        "model": payload.get("model", "sonar-pro"),
+        "created": int(time.time()),
+        "object": "chat.completion",
+        "citations": citations,
+        "images": [{"image_url": "https://images.example.com/1.jpg", "origin_url": citations[0] if citations else ""}],
+        "related_questions": ["What did officials say?"],
+        "usage": {"prompt_tokens": 1200, "completion_tokens": 800, "total_tokens": 2000},
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": json.dumps(content)},
+        }],
+    }
+
+
+async def stream_completion(body, latency):
+    # Spread the configured latency evenly over the content chunks, like a model generating tokens
+    content = body["choices"][0]["message"]["content"]
+    chunks = [content[idx:idx + STREAM_CHUNK_CHARS] for idx in range(0, len(content), STREAM_CHUNK_CHARS)]
+    for chunk in chunks:
+        await asyncio.sleep(latency / len(chunks))
+        event = {key: value for key, value in body.items() if key != "choices"}
+        event["object"] = "chat.completion.chunk"
+        event["choices"] = [{"index": 0, "delta": {"role": "assistant", "content": chunk}, "finish_reason": None}]
+        yield f"data: {json.dumps(event)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/chat/completions")
+async def chat_completions(request: Request):
+    payload = await request.json()
+    retry_after = FAULTS.throttle()
+    if retry_after:
+        return JSONResponse({"error": {"message": "Rate limit exceeded"}}, status_code=429, headers={"Retry-After": str(retry_after)})
+    latency = FAULTS.sample_latency()
+    error_status = FAULTS.sample_error()
+    if error_status:
+        await asyncio.sleep(latency)
+        return JSONResponse({"error": {"message": "Synthetic upstream failure"}}, status_code=error_status)
+
+    schema = (payload.get("response_format") or {}).get("json_schema", {}).get("schema") or {}
+    if schema.get("title") == "SourceResponse":
+        body = completion(payload, fake_sources(payload.get("messages", [])), [])
+    else:
+        citations = fake_citations()
+        body = completion(payload, fake_claims(citations), citations)
+
+    if payload.get("stream"):
+        return StreamingResponse(stream_completion(body, latency), media_type="text/event-stream")
+    await asyncio.sleep(latency)
+    return body
@@ -1,21 +1,28 @@
 from firebase_admin import credentials, initialize_app
 import json
-from firebase_admin import credentials, initialize_app
-from utils.utils import get_secret_key
-from utils.utils import download_pdf
-
-
-container_name = get_secret_key("SA-CONTAINERNAME")
-blob_name = get_secret_key("SA-BLOBNAME")
+import logging
+import threading
+from config.secrets import get_secrets, download_blob
 
-    
-data = download_pdf(blob_name, container_name)
+logger = logging.getLogger(__name__)
 
-data.seek(0)
-json_content = json.load(data)
+_firebase_app = None
+_firebase_lock = threading.Lock()
 
 
+def get_firebase_app():
+    # Initialized on first use rather than at import: the service-account JSON lives in Blob
+    # storage behind four secrets, which would otherwise sit on every replica's cold start.
+    global _firebase_app
+    if _firebase_app is None:
+        with _firebase_lock:
+            if _firebase_app is None:
+                secrets = get_secrets(["SA-CONTAINERNAME", "SA-BLOBNAME"])
+                data = download_blob(secrets["SA-CONTAINERNAME"], secrets["SA-BLOBNAME"])
+                data.seek(0)
+                json_content = json.load(data)
 
-cred = credentials.Certificate(json_content)
-firebase_app = initialize_app(cred)
-print("Firebase initialized")
\ No newline at end of file
+                cred = credentials.Certificate(json_content)
+                _firebase_app = initialize_app(cred)
+                logger.info("Firebase initialized")
+    return _firebase_app
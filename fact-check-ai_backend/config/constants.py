@@ -1,16 +1,120 @@
-from utils.utils import get_secret_key
+import os
+from config.secrets import get_secrets
 
 NEWS_API_KEY = "NEWSAPI-APIKEY-1"
-MONGO_URI = "mongodb://localhost:27017/"
-DB_NAME = "news_db"
+NEWS_API_BASE = os.getenv("NEWS_API_BASE", "https://newsapi.org/v2")
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("DB_NAME", "news_db")
 DAILY_ARTICLES = "daily_articles"
 TOPICS_COLLECTION = "topics"
 REPORT_COLLECTION = "fact_check_reports"
+SOURCE_CACHE_COLLECTION = "source_verifications"
+PUBLIC_FEED_COLLECTION = "public_reports"
+BATCH_COLLECTION = "analysis_batches"
+RATE_LIMIT_COLLECTION = "rate_limits"
+CLAIM_INDEX_COLLECTION = "claim_verdicts"
 
 USER_COLLECTION = "users"
 
-JWT_SECRET = get_secret_key("JWT-SECRET")
+# Topics are matched case-insensitively; the topic index is built with the same collation
+TOPIC_COLLATION = {"locale": "en", "strength": 2}
+# Create missing indexes (config/indexes.py) when the database module is first imported
+ENSURE_INDEXES_ON_STARTUP = os.getenv("ENSURE_INDEXES_ON_STARTUP", "true").lower() == "true"
+
+# Hot secrets are read through config.secrets.get_secret at the point of use, so background
+# refresh and invalidate_secret reach them; they are prefetched here in one concurrent batch so
+# a missing secret still fails at startup. Firebase credentials load lazily (config/auth.py)
+JWT_SECRET_NAME = "JWT-SECRET"
+PPLX_API_KEY_NAME = "PERPLEXITY-APIKEY-1"
+get_secrets([JWT_SECRET_NAME, PPLX_API_KEY_NAME])
+
 JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 360
 
-PPLX_API_KEY = get_secret_key("PERPLEXITY-APIKEY-1")
+# Accounts allowed to call the operational endpoints (secret cache stats/invalidation)
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+
+PPLX_API_BASE = os.getenv("PPLX_API_BASE", "https://api.perplexity.ai")
+
+# Upper bound on fact analyses running concurrently inside one worker process
+FACT_ANALYSIS_MAX_CONCURRENCY = int(os.getenv("FACT_ANALYSIS_MAX_CONCURRENCY", "64"))
+
+# Reports built from identical article metadata are reused for this long; 0 disables the cache
+REPORT_CACHE_TTL_HOURS = int(os.getenv("REPORT_CACHE_TTL_HOURS", "24"))
+
+# Cached per-URL source verifications older than this are re-analyzed; 0 disables the cache
+SOURCE_CACHE_TTL_DAYS = int(os.getenv("SOURCE_CACHE_TTL_DAYS", "7"))
+
+# Share of HTTP requests whose spans are recorded; exporter is "log", "file" (JSON lines in TRACE_FILE) or "none"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "log")
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+
+# LLM request/response payloads are only logged when enabled, and cut to this many characters
+LOG_LLM_PAYLOADS = os.getenv("LOG_LLM_PAYLOADS", "false").lower() == "true"
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+
+# Batch fact analysis: articles per batch and analyses running at once within one batch
+# (all batches together are still bounded by FACT_ANALYSIS_MAX_CONCURRENCY)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+# Running batches refresh heartbeat_at this often; after three missed beats (worker restart or
+# crash) a batch is marked interrupted
+BATCH_HEARTBEAT_SECONDS = int(os.getenv("BATCH_HEARTBEAT_SECONDS", "30"))
+
+# Estimated input-token caps (system prompt + schema + user prompt) per LLM call
+FACT_CHECK_MAX_INPUT_TOKENS = int(os.getenv("FACT_CHECK_MAX_INPUT_TOKENS", "3000"))
+SOURCE_ANALYSIS_MAX_INPUT_TOKENS = int(os.getenv("SOURCE_ANALYSIS_MAX_INPUT_TOKENS", "3000"))
+
+# Claim verdict index (utils/claim_index.py): verdicts younger than CLAIM_VERDICT_TTL_DAYS whose
+# TF-IDF similarity to a sentence of a new article reaches CLAIM_MATCH_THRESHOLD are given to the
+# model as prior evidence, at most CLAIM_PRIOR_MAX per article; a TTL of 0 disables the index
+CLAIM_VERDICT_TTL_DAYS = int(os.getenv("CLAIM_VERDICT_TTL_DAYS", "7"))
+CLAIM_MATCH_THRESHOLD = float(os.getenv("CLAIM_MATCH_THRESHOLD", "0.6"))
+CLAIM_PRIOR_MAX = int(os.getenv("CLAIM_PRIOR_MAX", "5"))
+
+# Upstream rate limits (utils/rate_limiter.py), in requests per second shared by all workers.
+# Each limiter starts at *_RATE and adapts between *_MIN_RATE and *_MAX_RATE from 429 feedback;
+# *_BURST caps the tokens a bucket can save up (defaults to the initial rate);
+# RATE_LIMIT_STORE is "mongo" (shared buckets in RATE_LIMIT_COLLECTION) or "local" (per process)
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "mongo")
+PPLX_RATE_LIMIT = {
+    "initial_rate": float(os.getenv("PPLX_RATE", "5")),
+    "max_rate": float(os.getenv("PPLX_MAX_RATE", "50")),
+    "min_rate": float(os.getenv("PPLX_MIN_RATE", "0.2")),
+    "burst": int(os.getenv("PPLX_BURST", "0")) or None,
+}
+NEWSAPI_RATE_LIMIT = {
+    "initial_rate": float(os.getenv("NEWSAPI_RATE", "10")),
+    "max_rate": float(os.getenv("NEWSAPI_MAX_RATE", "50")),
+    "min_rate": float(os.getenv("NEWSAPI_MIN_RATE", "0.5")),
+    "burst": int(os.getenv("NEWSAPI_BURST", "0")) or None,
+}
+# Retries after a failed upstream call wait Retry-After when given, else a jittered exponential backoff
+RETRY_BACKOFF_BASE_SECONDS = float(os.getenv("RETRY_BACKOFF_BASE_SECONDS", "1"))
+RETRY_BACKOFF_MAX_SECONDS = float(os.getenv("RETRY_BACKOFF_MAX_SECONDS", "30"))
+
+# Number of articles sent to Mongo per bulk_write during ingestion
+ARTICLE_BATCH_SIZE = int(os.getenv("ARTICLE_BATCH_SIZE", "500"))
+
+# NewsAPI fetch fan-out: concurrent requests per fetch run and pages followed per topic
+NEWS_FETCH_WORKERS = int(os.getenv("NEWS_FETCH_WORKERS", "16"))
+NEWS_MAX_PAGES = int(os.getenv("NEWS_MAX_PAGES", "5"))
+
+# Page size for the article listing endpoints (keyset pagination via the `next` token)
+ARTICLE_PAGE_SIZE = int(os.getenv("ARTICLE_PAGE_SIZE", "100"))
+ARTICLE_PAGE_SIZE_MAX = 1000
+
+# Page size for /fetch-report-summary
+REPORT_SUMMARY_PAGE_SIZE = int(os.getenv("REPORT_SUMMARY_PAGE_SIZE", "200"))
+REPORT_SUMMARY_PAGE_SIZE_MAX = 1000
+
+# Page size for the public report feed (/get-published-reports)
+PUBLIC_FEED_PAGE_SIZE = int(os.getenv("PUBLIC_FEED_PAGE_SIZE", "50"))
+PUBLIC_FEED_PAGE_SIZE_MAX = 200
+
+# Firebase user records cached on the login/verification paths; unverified users and
+# unknown emails expire quickly so a freshly verified or registered account shows up fast
+FIREBASE_USER_CACHE_TTL_SECONDS = int(os.getenv("FIREBASE_USER_CACHE_TTL_SECONDS", "300"))
+FIREBASE_UNVERIFIED_USER_TTL_SECONDS = int(os.getenv("FIREBASE_UNVERIFIED_USER_TTL_SECONDS", "5"))
+FIREBASE_USER_NEGATIVE_TTL_SECONDS = int(os.getenv("FIREBASE_USER_NEGATIVE_TTL_SECONDS", "10"))
@@ -1,5 +1,7 @@
 from pymongo import MongoClient
-from config.constants import MONGO_URI, DB_NAME, DAILY_ARTICLES, USER_COLLECTION, TOPICS_COLLECTION, REPORT_COLLECTION
+from motor.motor_asyncio import AsyncIOMotorClient
+from config.indexes import ensure_indexes
+from config.constants import ENSURE_INDEXES_ON_STARTUP, MONGO_URI, DB_NAME, DAILY_ARTICLES, USER_COLLECTION, TOPICS_COLLECTION, REPORT_COLLECTION, SOURCE_CACHE_COLLECTION, PUBLIC_FEED_COLLECTION, BATCH_COLLECTION, RATE_LIMIT_COLLECTION, CLAIM_INDEX_COLLECTION
 
 try:
     mongo_client = MongoClient(MONGO_URI)
@@ -8,6 +10,24 @@ try:
     daily_articles_collection = db[DAILY_ARTICLES]
     topics_collection = db[TOPICS_COLLECTION]
     report_collection = db[REPORT_COLLECTION]
+    source_cache_collection = db[SOURCE_CACHE_COLLECTION]
+    public_feed_collection = db[PUBLIC_FEED_COLLECTION]
+    rate_limit_collection = db[RATE_LIMIT_COLLECTION]
+
+    if ENSURE_INDEXES_ON_STARTUP:
+        ensure_indexes(db)
+
+    async_mongo_client = AsyncIOMotorClient(MONGO_URI)
+    async_db = async_mongo_client[DB_NAME]
+    async_users_collection = async_db[USER_COLLECTION]
+    async_daily_articles_collection = async_db[DAILY_ARTICLES]
+    async_topics_collection = async_db[TOPICS_COLLECTION]
+    async_report_collection = async_db[REPORT_COLLECTION]
+    async_source_cache_collection = async_db[SOURCE_CACHE_COLLECTION]
+    async_public_feed_collection = async_db[PUBLIC_FEED_COLLECTION]
+    async_batch_collection = async_db[BATCH_COLLECTION]
+    async_rate_limit_collection = async_db[RATE_LIMIT_COLLECTION]
+    async_claim_index_collection = async_db[CLAIM_INDEX_COLLECTION]
     print("MongoDB connection successful")
 except Exception as e:
     print(f"MongoDB connection failed: {e}")
@@ -0,0 +1,217 @@
+"""Declared MongoDB indexes and query-plan verification for the hot router queries.
+
+ensure_indexes() creates every declared index idempotently (it runs when config.db is
+imported) and warns about drift: declared indexes whose existing definition differs, and
+indexes present in the database that are not declared here. A unique index that cannot be
+built (duplicates in existing data) raises, so the app does not start without the
+guarantee its writes rely on; UNIQUE_INDEX_MIGRATIONS names the fix. verify_query_plans() runs
+explain() on each query in HOT_QUERIES and reports any plan containing a COLLSCAN.
+
+    python -m config.indexes                  # create missing indexes, report drift
+    python -m config.indexes --verify-plans   # also explain hot queries, exit 1 on COLLSCAN
+    python -m benchmarks.bench_query_plans    # same check against a seeded scratch database
+"""
+from datetime import datetime
+import logging
+import sys
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from config.constants import (
+    DAILY_ARTICLES, REPORT_COLLECTION, USER_COLLECTION, TOPICS_COLLECTION,
+    SOURCE_CACHE_COLLECTION, PUBLIC_FEED_COLLECTION, BATCH_COLLECTION, CLAIM_INDEX_COLLECTION, TOPIC_COLLATION,
+)
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    DAILY_ARTICLES: [
+        # Ingestion de-duplication (store_articles upserts on title) and custom search exact matches
+        IndexModel([("title", ASCENDING)], name="title_unique", unique=True,
+                   partialFilterExpression={"title": {"$type": "string"}}),
+        IndexModel([("article_id", ASCENDING)], name="article_id_unique", unique=True,
+                   partialFilterExpression={"article_id": {"$type": "string"}}),
+        # Case-insensitive topic listing, newest first (queries must use TOPIC_COLLATION)
+        IndexModel([("topic", ASCENDING), ("_id", DESCENDING)], name="topic_id_ci", collation=TOPIC_COLLATION),
+        # Recency per topic and "today's news" range queries on the BSON publishedAt
+        IndexModel([("topic", ASCENDING), ("publishedAt", DESCENDING)], name="topic_published"),
+        IndexModel([("publishedAt", DESCENDING)], name="published"),
+        # Per-user report summaries and report lookups inside the reports array
+        IndexModel([("reports.user_email", ASCENDING)], name="report_user_email"),
+        IndexModel([("reports.report_id", ASCENDING)], name="report_report_id"),
+    ],
+    REPORT_COLLECTION: [
+        IndexModel([("report_id", ASCENDING)], name="report_id_unique", unique=True),
+        # Content-addressed report cache
+        IndexModel([("content_hash", ASCENDING), ("created_at", DESCENDING)], name="content_hash_created"),
+    ],
+    SOURCE_CACHE_COLLECTION: [
+        IndexModel([("url", ASCENDING)], name="url_unique", unique=True),
+    ],
+    PUBLIC_FEED_COLLECTION: [
+        # One feed entry per user publishing a (possibly shared) report
+        IndexModel([("report_id", ASCENDING), ("user_email", ASCENDING)], name="report_id_user_unique", unique=True),
+        # Keyset-paginated feed, newest first
+        IndexModel([("published_at", DESCENDING), ("report_id", DESCENDING), ("user_email", DESCENDING)], name="published_at_report_user"),
+    ],
+    USER_COLLECTION: [
+        IndexModel([("email", ASCENDING)], name="email"),
+        IndexModel([("uid", ASCENDING)], name="uid"),
+    ],
+    TOPICS_COLLECTION: [
+        IndexModel([("name", ASCENDING)], name="name"),
+    ],
+    BATCH_COLLECTION: [
+        IndexModel([("batch_id", ASCENDING)], name="batch_id_unique", unique=True),
+        # Orphaned batch sweep (running batches with a stale heartbeat)
+        IndexModel([("status", ASCENDING), ("heartbeat_at", ASCENDING)], name="status_heartbeat"),
+    ],
+    CLAIM_INDEX_COLLECTION: [
+        IndexModel([("claim_hash", ASCENDING)], name="claim_hash_unique", unique=True),
+        # Near-duplicate candidates: multikey over the MinHash LSH band keys
+        IndexModel([("lsh", ASCENDING), ("verified_at", DESCENDING)], name="lsh_verified"),
+    ],
+}
+
+# (collection, description, filter, cursor options) for every query the routers run per request
+HOT_QUERIES = [
+    (DAILY_ARTICLES, "article by article_id", {"article_id": "x"}, {}),
+    (DAILY_ARTICLES, "report entry by article_id", {"article_id": "x", "reports.report_id": "r"}, {}),
+    (DAILY_ARTICLES, "ingestion duplicate check", {"title": "x"}, {}),
+    (DAILY_ARTICLES, "custom search exact match", {"title": {"$in": ["x", "y"], "$type": "string"}}, {}),
+    (DAILY_ARTICLES, "articles by topic", {"topic": "x"}, {"sort": [("_id", DESCENDING)], "collation": TOPIC_COLLATION}),
+    (DAILY_ARTICLES, "all articles", {}, {"sort": [("_id", DESCENDING)]}),
+    (DAILY_ARTICLES, "latest news for topic", {"topic": "x", "publishedAt": {"$gte": datetime(2025, 1, 1)}}, {}),
+    (DAILY_ARTICLES, "today's news", {"publishedAt": {"$gte": datetime(2025, 1, 1), "$lt": datetime(2025, 1, 2)}}, {}),
+    (DAILY_ARTICLES, "batch articles by topic and day",
+     {"topic": "x", "publishedAt": {"$gte": datetime(2025, 1, 1), "$lt": datetime(2025, 1, 2)}}, {"collation": TOPIC_COLLATION}),
+    (DAILY_ARTICLES, "report summaries for user", {"reports": {"$elemMatch": {"analyzed": True, "user_email": "x"}}}, {}),
+    (REPORT_COLLECTION, "report by report_id", {"report_id": "x"}, {}),
+    (REPORT_COLLECTION, "report cache lookup",
+     {"content_hash": "x", "created_at": {"$gte": datetime(2025, 1, 1)}, "fact_check_report": {"$ne": None}},
+     {"sort": [("created_at", DESCENDING)]}),
+    (SOURCE_CACHE_COLLECTION, "source cache lookup", {"url": {"$in": ["x"]}, "verified_at": {"$gte": datetime(2025, 1, 1)}}, {}),
+    (BATCH_COLLECTION, "batch by batch_id", {"batch_id": "x"}, {}),
+    (BATCH_COLLECTION, "orphaned batch sweep", {"status": "running", "$or": [
+        {"heartbeat_at": {"$lt": datetime(2025, 1, 1)}},
+        {"heartbeat_at": {"$exists": False}, "created_at": {"$lt": datetime(2025, 1, 1)}},
+    ]}, {}),
+    (CLAIM_INDEX_COLLECTION, "claim candidates by LSH band", {"lsh": {"$in": ["x"]}, "verified_at": {"$gte": datetime(2025, 1, 1)}}, {}),
+    (PUBLIC_FEED_COLLECTION, "public feed page", {}, {"sort": [("published_at", DESCENDING), ("report_id", DESCENDING), ("user_email", DESCENDING)]}),
+    (PUBLIC_FEED_COLLECTION, "public feed entry by report and user", {"report_id": "x", "user_email": "y"}, {}),
+    (USER_COLLECTION, "user by email", {"email": "x"}, {}),
+    (TOPICS_COLLECTION, "topics by name", {"name": {"$in": ["x"]}}, {}),
+]
+
+
+def _options(index_model):
+    return {key: value for key, value in index_model.document.items() if key not in ("key", "name")}
+
+
+def _differs(declared, existing):
+    if list(declared.document["key"].items()) != list(existing["key"]):
+        return True
+    for option, value in _options(declared).items():
+        current = existing.get(option)
+        if isinstance(value, dict) and isinstance(current, dict):
+            # The server echoes collations with every default filled in; compare what we declared
+            if any(current.get(key) != sub_value for key, sub_value in value.items()):
+                return True
+        elif current != value:
+            return True
+    return False
+
+
+def check_index_drift(database):
+    drift = []
+    for collection_name, declared_indexes in INDEXES.items():
+        existing = database[collection_name].index_information()
+        declared_names = {index.document["name"] for index in declared_indexes}
+        for index in declared_indexes:
+            name = index.document["name"]
+            if name in existing and _differs(index, existing[name]):
+                drift.append(f"{collection_name}.{name}: definition differs from declaration")
+        for name in existing:
+            if name != "_id_" and name not in declared_names:
+                drift.append(f"{collection_name}.{name}: not declared in config/indexes.py")
+    for message in drift:
+        logger.warning(f"Index drift: {message}")
+    return drift
+
+
+# Run before a unique index can be built over data that predates it
+UNIQUE_INDEX_MIGRATIONS = {
+    (DAILY_ARTICLES, "title_unique"): "python -m migrations.dedupe_article_titles",
+}
+
+
+def ensure_indexes(database):
+    created, unique_failures = [], []
+    for collection_name, declared_indexes in INDEXES.items():
+        collection = database[collection_name]
+        existing = collection.index_information()
+        missing = [index for index in declared_indexes if index.document["name"] not in existing]
+        for index in missing:
+            name = index.document["name"]
+            try:
+                collection.create_indexes([index])
+                created.append(f"{collection_name}.{name}")
+            except Exception as e:
+                logger.error(f"Failed to create index {collection_name}.{name}: {e}")
+                if index.document.get("unique"):
+                    migration = UNIQUE_INDEX_MIGRATIONS.get((collection_name, name))
+                    unique_failures.append(f"{collection_name}.{name}" + (f" (run `{migration}`)" if migration else ""))
+    if created:
+        logger.info(f"Created indexes: {', '.join(created)}")
+    check_index_drift(database)
+    if unique_failures:
+        # Writes rely on these for de-duplication (e.g. store_articles upserts on title); serving
+        # without them would silently store duplicates
+        raise RuntimeError(f"Unique indexes could not be built: {'; '.join(unique_failures)}")
+    return created
+
+
+def _plan_stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _plan_stages(value)
+
+
+def verify_query_plans(database):
+    failures = []
+    for collection_name, description, query, options in HOT_QUERIES:
+        cursor = database[collection_name].find(query)
+        if "sort" in options:
+            cursor = cursor.sort(options["sort"])
+        if "collation" in options:
+            cursor = cursor.collation(options["collation"])
+        winning_plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = set(_plan_stages(winning_plan))
+        status = "COLLSCAN" if "COLLSCAN" in stages else "ok"
+        logger.info(f"{collection_name}: {description}: {status} ({', '.join(sorted(stages))})")
+        if status != "ok":
+            failures.append(f"{collection_name}: {description}")
+    return failures
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verify-plans", action="store_true", help="Explain hot queries and fail on COLLSCAN")
+    args = parser.parse_args()
+
+    from config.db import db
+
+    ensure_indexes(db)
+    if args.verify_plans:
+        failures = verify_query_plans(db)
+        if failures:
+            logger.error(f"Queries planned as COLLSCAN: {'; '.join(failures)}")
+            sys.exit(1)
@@ -1,3 +1,7 @@
+from dataclasses import dataclass, asdict
+from typing import Literal
+import os
+
 SONAR_PRO_MODEL_DEFAULTS = {
     "max_tokens": 4096,
     "temperature": 0.2,
@@ -13,3 +17,66 @@ SONAR_PRO_MODEL_DEFAULTS = {
         "search_context_size": "low",
     }
 }
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """Immutable model settings for one analysis; every call builds fresh request kwargs from it."""
+
+    name: str
+    model: str = "sonar-pro"
+    max_tokens: int = SONAR_PRO_MODEL_DEFAULTS["max_tokens"]
+    temperature: float = SONAR_PRO_MODEL_DEFAULTS["temperature"]
+    top_p: float = SONAR_PRO_MODEL_DEFAULTS["top_p"]
+    search_context_size: str = SONAR_PRO_MODEL_DEFAULTS["web_search_options"]["search_context_size"]
+    return_images: bool = True
+    return_related_questions: bool = True
+
+    def _request_kwargs(self, schema, **extra):
+        return {
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "stream": False,
+            "response_format": {"type": "json_schema", "json_schema": {"schema": schema}},
+            "web_search_options": {"search_context_size": self.search_context_size},
+            **extra,
+        }
+
+    def fact_check_kwargs(self, schema, stream=False):
+        return self._request_kwargs(
+            schema,
+            stream=stream,
+            return_images=self.return_images,
+            return_related_questions=self.return_related_questions,
+        )
+
+    def source_analysis_kwargs(self, schema, excluded_domain):
+        # Images and related questions are only rendered for the fact check itself
+        return self._request_kwargs(
+            schema,
+            return_images=False,
+            return_related_questions=False,
+            search_domain_filter=[f"-{excluded_domain}"],
+        )
+
+    def as_dict(self):
+        return asdict(self)
+
+
+ProfileName = Literal["fast", "standard", "thorough"]
+
+MODEL_PROFILES = {
+    "fast": ModelProfile(name="fast", max_tokens=2048, search_context_size="low", return_images=False, return_related_questions=False),
+    "standard": ModelProfile(name="standard"),
+    "thorough": ModelProfile(name="thorough", max_tokens=8192, search_context_size="high"),
+}
+
+DEFAULT_MODEL_PROFILE = os.getenv("DEFAULT_MODEL_PROFILE", "standard")
+
+
+def get_model_profile(name=None):
+    try:
+        return MODEL_PROFILES[name or DEFAULT_MODEL_PROFILE]
+    except KeyError:
+        raise ValueError(f"Unknown model profile: {name}")
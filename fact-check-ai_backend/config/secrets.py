@@ -0,0 +1,221 @@
+"""Secret and blob bootstrap shared by the whole process.
+
+Secrets come from a provider selected by SECRETS_PROVIDER:
+
+- "azure" (default): Azure Key Vault through one shared DefaultAzureCredential/SecretClient,
+  blobs from the storage account named by the SA-ENDPOINT / SA-KEY secrets.
+- "local": a JSON file of {name: value} (LOCAL_SECRETS_FILE, overridable per secret with
+  LOCAL_SECRET_<NAME> env vars) and blobs read from LOCAL_BLOB_DIR/<container>/<blob>.
+
+Lookups go through three layers: an in-process TTL cache (SECRET_TTL_SECONDS, per-key
+overrides in SECRET_TTLS, refreshed in the background before expiry and single-flight on
+misses), then, when SECRETS_CACHE_KEY (a Fernet key) is set, an encrypted file kept for
+SECRETS_CACHE_TTL_SECONDS so a restarting replica can skip the vault, then the provider.
+get_secrets() resolves every missing name concurrently. Callers read secrets per use
+(get_secret / aget_secret) rather than keeping copies, so refreshes and invalidate_secret()
+take effect without a restart.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SECRETS_PROVIDER = os.getenv("SECRETS_PROVIDER", "azure")
+KEYVAULT_URI = os.getenv("KEYVAULT_URI", "https://kvfactanalysis.vault.azure.net/")
+LOCAL_SECRETS_FILE = os.getenv("LOCAL_SECRETS_FILE", "local_secrets.json")
+LOCAL_BLOB_DIR = os.getenv("LOCAL_BLOB_DIR", "local_blobs")
+SECRETS_CACHE_KEY = os.getenv("SECRETS_CACHE_KEY")
+SECRETS_CACHE_PATH = os.getenv("SECRETS_CACHE_PATH", os.path.join(tempfile.gettempdir(), "fact-analysis-secrets.bin"))
+SECRETS_CACHE_TTL_SECONDS = int(os.getenv("SECRETS_CACHE_TTL_SECONDS", "300"))
+SECRET_TTL_SECONDS = int(os.getenv("SECRET_TTL_SECONDS", "900"))
+SECRET_TTLS = json.loads(os.getenv("SECRET_TTLS", "{}"))
+
+
+class KeyVaultProvider:
+    def __init__(self, vault_url):
+        self.vault_url = vault_url
+        self._secret_client = None
+        self._blob_service_client = None
+        self._secret_lock = threading.Lock()
+        self._blob_lock = threading.Lock()
+
+    def _get_secret_client(self):
+        with self._secret_lock:
+            if self._secret_client is None:
+                from azure.identity import DefaultAzureCredential
+                from azure.keyvault.secrets import SecretClient
+
+                self._secret_client = SecretClient(vault_url=self.vault_url, credential=DefaultAzureCredential())
+        return self._secret_client
+
+    def _get_blob_service_client(self):
+        with self._blob_lock:
+            if self._blob_service_client is None:
+                from azure.storage.blob import BlobServiceClient
+
+                secrets = get_secrets(["SA-ENDPOINT", "SA-KEY"])
+                self._blob_service_client = BlobServiceClient(
+                    account_url=secrets["SA-ENDPOINT"],
+                    credential=secrets["SA-KEY"],
+                )
+        return self._blob_service_client
+
+    def get_secret(self, name):
+        return self._get_secret_client().get_secret(name).value
+
+    def download_blob(self, container_name, blob_name):
+        blob_client = self._get_blob_service_client().get_container_client(container_name).get_blob_client(blob_name)
+        stream = BytesIO()
+        blob_client.download_blob().readinto(stream)
+        stream.seek(0)
+        return stream
+
+
+class LocalProvider:
+    def __init__(self, secrets_file, blob_dir):
+        self.secrets_file = secrets_file
+        self.blob_dir = blob_dir
+        self._secrets = None
+
+    def get_secret(self, name):
+        env_name = "LOCAL_SECRET_" + name.upper().replace("-", "_")
+        if env_name in os.environ:
+            return os.environ[env_name]
+        if self._secrets is None:
+            with open(self.secrets_file) as secrets_file:
+                self._secrets = json.load(secrets_file)
+        return self._secrets[name]
+
+    def download_blob(self, container_name, blob_name):
+        with open(os.path.join(self.blob_dir, container_name, blob_name), "rb") as blob_file:
+            return BytesIO(blob_file.read())
+
+
+class EncryptedSecretCache:
+    def __init__(self, path, key, ttl_seconds):
+        from cryptography.fernet import Fernet
+
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._fernet = Fernet(key)
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as cache_file:
+                return json.loads(self._fernet.decrypt(cache_file.read()))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable secrets cache {self.path}: {e}")
+            return {}
+
+    def load(self):
+        now = time.time()
+        with self._lock:
+            entries = self._read()
+        return {name: entry["value"] for name, entry in entries.items() if now - entry["fetched_at"] < self.ttl_seconds}
+
+    def store(self, secrets):
+        now = time.time()
+        with self._lock:
+            entries = self._read()
+            entries.update({name: {"value": value, "fetched_at": now} for name, value in secrets.items()})
+            token = self._fernet.encrypt(json.dumps(entries).encode())
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as cache_file:
+                cache_file.write(token)
+            os.replace(tmp_path, self.path)
+
+
+_provider = None
+_cache = None
+secret_cache = TTLCache("secret", default_ttl=SECRET_TTL_SECONDS)
+_bootstrap_lock = threading.Lock()
+
+
+def set_provider(provider):
+    global _provider
+    _provider = provider
+
+
+def get_provider():
+    global _provider
+    with _bootstrap_lock:
+        if _provider is None:
+            if SECRETS_PROVIDER == "local":
+                _provider = LocalProvider(LOCAL_SECRETS_FILE, LOCAL_BLOB_DIR)
+            else:
+                _provider = KeyVaultProvider(KEYVAULT_URI)
+            logger.info(f"Secret provider initialized: {type(_provider).__name__}")
+    return _provider
+
+
+def get_cache():
+    global _cache
+    if SECRETS_CACHE_KEY and _cache is None:
+        with _bootstrap_lock:
+            if _cache is None:
+                _cache = EncryptedSecretCache(SECRETS_CACHE_PATH, SECRETS_CACHE_KEY, SECRETS_CACHE_TTL_SECONDS)
+    return _cache
+
+
+def _load_secret(name):
+    cache = get_cache()
+    if cache:
+        cached = cache.load()
+        if name in cached:
+            return cached[name]
+    start = time.perf_counter()
+    value = get_provider().get_secret(name)
+    logger.info(f"Fetched secret {name} from provider in {time.perf_counter() - start:.3f}s")
+    if cache:
+        cache.store({name: value})
+    return value
+
+
+def get_secret(name):
+    return secret_cache.get(name, lambda: _load_secret(name), ttl=SECRET_TTLS.get(name, SECRET_TTL_SECONDS))
+
+
+async def aget_secret(name):
+    # Cache hits return immediately; only a miss reaches the provider, off the event loop
+    if secret_cache.peek(name)[0]:
+        return get_secret(name)
+    return await asyncio.to_thread(get_secret, name)
+
+
+def get_secrets(names):
+    values, missing = {}, []
+    for name in dict.fromkeys(names):
+        if secret_cache.peek(name)[0]:
+            values[name] = get_secret(name)
+        else:
+            missing.append(name)
+    if len(missing) == 1:
+        values[missing[0]] = get_secret(missing[0])
+    elif missing:
+        with ThreadPoolExecutor(max_workers=len(missing), thread_name_prefix="secret-fetch") as pool:
+            values.update(zip(missing, pool.map(get_secret, missing)))
+    return {name: values[name] for name in names}
+
+
+def invalidate_secret(name=None):
+    secret_cache.invalidate(name)
+
+
+def get_secret_cache_stats():
+    return secret_cache.stats()
+
+
+def download_blob(container_name, blob_name):
+    return get_provider().download_blob(container_name, blob_name)
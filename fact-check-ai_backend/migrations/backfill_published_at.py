@@ -0,0 +1,37 @@
+"""One-off migration: store article.publishedAt as a BSON datetime in a top-level publishedAt.
+
+Documents ingested before publishedAt was stored natively only carry the NewsAPI string.
+The conversion runs server side in a single update_many with an aggregation pipeline;
+unparseable values become null. Safe to re-run: converted documents are skipped.
+
+    python -m migrations.backfill_published_at
+"""
+import logging
+
+from config.db import daily_articles_collection
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_published_at():
+    result = daily_articles_collection.update_many(
+        {"publishedAt": {"$exists": False}, "article.publishedAt": {"$type": "string"}},
+        [{
+            "$set": {
+                "publishedAt": {
+                    "$dateFromString": {
+                        "dateString": "$article.publishedAt",
+                        "onError": None,
+                        "onNull": None,
+                    }
+                }
+            }
+        }],
+    )
+    logger.info(f"Backfilled publishedAt on {result.modified_count} of {result.matched_count} articles")
+    return result.modified_count
+
+
+if __name__ == "__main__":
+    backfill_published_at()
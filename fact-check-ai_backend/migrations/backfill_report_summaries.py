@@ -0,0 +1,41 @@
+"""One-off migration: precompute the summary field on reports stored before it existed.
+
+/fetch-report-summary only reads report.summary; this fills it in for older reports using
+the same build_report_summary that store_report uses. Safe to re-run.
+
+    python -m migrations.backfill_report_summaries
+"""
+import logging
+
+from pymongo import UpdateOne
+
+from config.db import report_collection
+from utils.fact_analysis import build_report_summary
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def backfill_report_summaries():
+    cursor = report_collection.find(
+        {"summary": {"$exists": False}},
+        {"_id": 1, "title": 1, "fact_check_report.claims.fact_check_category": 1,
+         "fact_check_report.overall_category": 1, "fact_check_report.category": 1, "fact_check_report.notes": 1},
+    )
+    operations, updated = [], 0
+    for report in cursor:
+        summary = build_report_summary(report.get("fact_check_report"), report.get("title"))
+        operations.append(UpdateOne({"_id": report["_id"]}, {"$set": {"summary": summary}}))
+        if len(operations) >= BATCH_SIZE:
+            updated += report_collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += report_collection.bulk_write(operations, ordered=False).modified_count
+    logger.info(f"Backfilled summaries on {updated} reports")
+    return updated
+
+
+if __name__ == "__main__":
+    backfill_report_summaries()
@@ -0,0 +1,40 @@
+"""One-off migration: build the public_reports feed from reports already marked public.
+
+Walks daily_articles for report entries with settings == "public" and upserts a feed
+entry per (report_id, user_email) through publish_report. Feeds built before entries were
+per user are keyed on report_id alone: that unique index is dropped first so ensure_indexes
+can create report_id_user_unique. Safe to re-run.
+
+    python -m migrations.build_public_feed
+"""
+import asyncio
+import logging
+
+from config.db import db, async_daily_articles_collection, async_public_feed_collection
+from config.indexes import ensure_indexes
+from utils.public_feed import publish_report
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def build_public_feed():
+    if "report_id_unique" in await async_public_feed_collection.index_information():
+        await async_public_feed_collection.drop_index("report_id_unique")
+        logger.info("Dropped the report_id-only unique index of the public feed")
+        ensure_indexes(db)
+    published = 0
+    cursor = async_daily_articles_collection.find(
+        {"reports.settings": "public"},
+        {"_id": 0, "article_id": 1, "article": 1, "reports": 1},
+    )
+    async for article in cursor:
+        for report in article.get("reports", []):
+            if report.get("settings") == "public" and report.get("report_id"):
+                published += await publish_report(article, report["report_id"], report.get("user_email"))
+    logger.info(f"Published {published} reports to the public feed")
+    return published
+
+
+if __name__ == "__main__":
+    asyncio.run(build_public_feed())
@@ -0,0 +1,73 @@
+"""One-off migration: remove duplicate daily_articles titles so title_unique can be built.
+
+Ingestion used to check for a title and insert in two steps, so concurrent fetches could
+store the same title more than once. For every duplicated title the oldest document (lowest
+_id) is kept; report entries of the other copies are merged into it, public feed entries are
+pointed at its article_id, and the copies are deleted. Afterwards the declared indexes are
+created, which fails loudly if a unique index still cannot be built. Safe to re-run.
+
+    python -m migrations.dedupe_article_titles [--dry-run]
+"""
+import os
+
+# config.db builds indexes on import; that is exactly what fails while duplicates exist
+os.environ["ENSURE_INDEXES_ON_STARTUP"] = "false"
+
+import argparse
+import logging
+
+from config.db import db, daily_articles_collection, public_feed_collection
+from config.indexes import ensure_indexes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def duplicate_title_groups():
+    return daily_articles_collection.aggregate([
+        {"$match": {"title": {"$type": "string"}}},
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": "$title", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+
+
+def merge_duplicates(title, ids, dry_run=False):
+    documents = list(daily_articles_collection.find({"_id": {"$in": ids}}, {"article_id": 1, "reports": 1}).sort("_id", 1))
+    keeper, copies = documents[0], documents[1:]
+    seen = {(entry.get("report_id"), entry.get("user_email")) for entry in keeper.get("reports") or []}
+    merged_reports = []
+    for copy in copies:
+        for entry in copy.get("reports") or []:
+            key = (entry.get("report_id"), entry.get("user_email"))
+            if key not in seen:
+                seen.add(key)
+                merged_reports.append(entry)
+    copy_article_ids = [copy["article_id"] for copy in copies if copy.get("article_id")]
+    logger.info(f"'{title}': keeping {keeper['_id']}, removing {len(copies)} copies, merging {len(merged_reports)} report entries")
+    if dry_run:
+        return len(copies)
+
+    if merged_reports:
+        daily_articles_collection.update_one({"_id": keeper["_id"]}, {"$push": {"reports": {"$each": merged_reports}}})
+    if copy_article_ids and keeper.get("article_id"):
+        public_feed_collection.update_many({"article_id": {"$in": copy_article_ids}}, {"$set": {"article_id": keeper["article_id"]}})
+    daily_articles_collection.delete_many({"_id": {"$in": [copy["_id"] for copy in copies]}})
+    return len(copies)
+
+
+def dedupe_article_titles(dry_run=False):
+    removed = 0
+    for group in duplicate_title_groups():
+        removed += merge_duplicates(group["_id"], group["ids"], dry_run=dry_run)
+    logger.info(f"{'Would remove' if dry_run else 'Removed'} {removed} duplicate articles")
+    if not dry_run:
+        ensure_indexes(db)
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be merged and removed")
+    args = parser.parse_args()
+    dedupe_article_titles(dry_run=args.dry_run)
@@ -1,12 +1,14 @@
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional 
 import datetime
+from config.model_configs import ProfileName
 
 class NewsRequest(BaseModel):
     country: str
     topics: List[str]
     date_str : str
-    page_size : int
+    # NewsAPI returns at most 100 articles per page
+    page_size : int = Field(..., ge=1, le=100)
     
 class CustomSearchRequest(BaseModel):
     q: Optional[str] = None
@@ -35,6 +37,16 @@ class TokenData(BaseModel):
     uid: str
     email: str
     
+class BatchAnalysisRequest(BaseModel):
+    email: str
+    article_ids: Optional[List[str]] = None
+    topic: Optional[str] = None
+    date_str: Optional[str] = None  # YYYY-MM-DD, with topic
+    force_refresh: bool = False
+    skip_analyzed: bool = True
+    profile: Optional[ProfileName] = None
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
 class TopicSelection(BaseModel):
     topics: List[str]
     email: str
\ No newline at end of file
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Form
-from firebase_admin import auth
 from fastapi.security import OAuth2PasswordRequestForm
 from models.models import UserCreate, Token, TopicSelection
-from utils.auth_util import hash_password, check_user_exists, get_user_from_db, create_access_token, verify_token, update_user_profile
-from config.db import users_collection
+from utils.auth_util import hash_password, check_user_exists, get_user_from_db, create_access_token, verify_token, verify_admin, update_user_profile, aget_firebase_user_by_email, invalidate_firebase_user
+from utils.repository import user_repository
 import datetime
 import logging
-from utils.utils import get_secret_key, download_pdf
+from utils.utils import get_secret_key
+from config.secrets import get_secret_cache_stats, invalidate_secret
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +26,9 @@ async def register_user(user: UserCreate):
             "hashed_password": hash_password(user.password),
             "created_at": datetime.datetime.utcnow()
         }
-        users_collection.insert_one(user_data)
+        await user_repository.insert_one(user_data)
+        # Drop any negative "user not found" entry cached before the account existed
+        invalidate_firebase_user(email=user.email, uid=user.firebase_uid)
         logger.info(f"User data inserted into MongoDB for UID: {user.firebase_uid}")
         access_token = create_access_token({"uid": user.firebase_uid, "email": user.email})
         logger.info(f"Access token created for UID: {user.firebase_uid}")
@@ -36,7 +40,7 @@ async def register_user(user: UserCreate):
 @auth_router.get('/verified')
 async def is_verified(email : str):
     try:
-        user = auth.get_user_by_email(email=email)
+        user = await aget_firebase_user_by_email(email)
         return {"is_verified" : user.email_verified}
     except Exception as e:
         logger.error(f"Login failed for user {email}: {str(e)}")
@@ -46,12 +50,10 @@ async def is_verified(email : str):
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     logger.info(f"Attempting login for user: {form_data.username}")
     try:
-        firebase_user = auth.get_user_by_email(form_data.username)
-        user_data = get_user_from_db(form_data.username)
+        firebase_user = await aget_firebase_user_by_email(form_data.username)
+        user_data = await get_user_from_db(form_data.username)
         if not user_data or hash_password(form_data.password) != user_data["hashed_password"]:
             logger.warning(f"Login failed for user {form_data.username}: Invalid credentials")
-            print(hash_password(form_data.password))
-            print(user_data["hashed_password"])
             raise HTTPException(status_code=401, detail="Invalid credentials")
         token = create_access_token({"uid": firebase_user.uid, "email": firebase_user.email})
         logger.info(f"Login successful for user: {form_data.username}")
@@ -64,11 +66,11 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 async def update_topic_selection(topics_model : TopicSelection):
     logger.info(f"Attempting to update topic selection for email: {topics_model.email}")
     try:
-        user_data = get_user_from_db(topics_model.email)
+        user_data = await get_user_from_db(topics_model.email)
         if not user_data:
             logger.warning(f"Update topic selection failed: User not found: {topics_model.email}")
             raise HTTPException(status_code=404, detail="User not found")
-        users_collection.update_one({"email": topics_model.email}, {"$set": {"topics": topics_model.topics}})
+        await user_repository.set_fields(topics_model.email, {"topics": topics_model.topics})
         logger.info(f"Topic selection updated successfully for email: {topics_model.email}")
         return {"message": "Topic selection updated successfully"}
     except Exception as e:
@@ -79,11 +81,11 @@ async def update_topic_selection(topics_model : TopicSelection):
 async def update_country_selection(countries: str = Form(...), email: str = Form(...)):
     logger.info(f"Attempting to update country selection for email: {email}")
     try:
-        user_data = get_user_from_db(email)
+        user_data = await get_user_from_db(email)
         if not user_data:
             logger.warning(f"Update country selection failed: User not found: {email}")
             raise HTTPException(status_code=404, detail="User not found")
-        users_collection.update_one({"email": email}, {"$set": {"countries": countries}})
+        await user_repository.set_fields(email, {"countries": countries})
         logger.info(f"Country selection updated successfully for email: {email}")
         return {"message": "Country selection updated successfully"}
     except Exception as e:
@@ -94,12 +96,13 @@ async def update_country_selection(countries: str = Form(...), email: str = Form
 async def update_profile(email: str = Form(...), display_name: str = Form(...)):
     logger.info(f"Attempting to update profile for email: {email}")
     try:
-        user_data = get_user_from_db(email)
+        user_data = await get_user_from_db(email)
         if not user_data:
             logger.warning(f"Update profile failed: User not found: {email}")
             raise HTTPException(status_code=404, detail="User not found")
-        update_user_profile(user_data["uid"], display_name)
-        users_collection.update_one({"email": email}, {"$set": {"name": display_name}})
+        await update_user_profile(user_data["uid"], display_name)
+        invalidate_firebase_user(email=email, uid=user_data["uid"])
+        await user_repository.set_fields(email, {"name": display_name})
         logger.info(f"Profile updated successfully for email: {email}")
         return {"message": "Profile updated successfully"}
     except Exception as e:
@@ -120,8 +123,20 @@ async def update_profile(email: str = Form(...), display_name: str = Form(...)):
 @auth_router.get("/get-secret-key")
 async def get_secret_key_endpoint(key: str):
     try:
-        secret_value = get_secret_key(key)
+        # Served from the process-wide secret cache; only a cold miss reaches the vault,
+        # and that happens off the event loop
+        secret_value = await run_in_threadpool(get_secret_key, key)
         return {"key": key, "value": secret_value}
     except Exception as e:
         logger.error(f"Failed to retrieve secret key {key}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve secret key: {str(e)}")
+
+@auth_router.get("/secret-cache/stats", dependencies=[Depends(verify_admin)])
+async def get_secret_cache_stats_endpoint():
+    return get_secret_cache_stats()
+
+@auth_router.post("/secret-cache/invalidate")
+async def invalidate_secret_cache(key: Optional[str] = None, admin = Depends(verify_admin)):
+    invalidate_secret(key)
+    logger.info(f"Secret cache invalidated by {admin.email} (key: {key})")
+    return {"message": "Secret cache invalidated", "key": key}
@@ -1,7 +1,15 @@
 from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-from utils.fact_analysis import fact_analysis_base
-from config.db import daily_articles_collection
+from utils.fact_analysis import fact_analysis_coalesced, fact_analysis_stream_detached
+from utils.public_feed import publish_report, unpublish_report
+from utils.batch_analysis import start_batch, get_batch_progress
+from models.models import BatchAnalysisRequest
+from utils.repository import article_repository
+from utils.tracing import get_request_id
+from config.model_configs import ProfileName, DEFAULT_MODEL_PROFILE
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,67 +18,110 @@ logger = logging.getLogger(__name__)
 fact_analysis_router = APIRouter()
 
 @fact_analysis_router.post("/fact-analysis")
-def fact_analysis(article_id : str, email : str):
+async def fact_analysis(article_id : str, email : str, force_refresh : bool = False, profile : ProfileName = DEFAULT_MODEL_PROFILE):
     start_time = datetime.now()
-    logger.info(f"Fact analysis started at {start_time} for article_id: {article_id}")
+    logger.info(f"Fact analysis started at {start_time} for article_id: {article_id}, profile: {profile}, request_id: {get_request_id()}")
     try:
-        article = daily_articles_collection.find_one({"article_id": article_id})
+        article = await article_repository.get_by_article_id(article_id)
         if article is None:
             raise HTTPException(status_code=404, detail="Article not found")
 
-        report_id = fact_analysis_base(article)
-
-        daily_articles_collection.update_one(
-            {"article_id": article_id},
-            {
-            "$push": {
-                "reports": {
-                "report_id": report_id,
-                "analyzed": True,
-                "user_email": email
-                }
-            }
-            }
-        )
+        report_id = await fact_analysis_coalesced(article, force_refresh=force_refresh, profile=profile)
+        if not report_id:
+            raise HTTPException(status_code=502, detail="Fact analysis failed")
+
+        await article_repository.push_report(article_id, report_id, email)
 
         end_time = datetime.now()
         duration = end_time - start_time
-        logger.info(f"Fact analysis completed at {end_time} for article_id: {article_id}. Duration: {duration}")
+        logger.info(f"Fact analysis completed at {end_time} for article_id: {article_id}, request_id: {get_request_id()}. Duration: {duration}")
 
         return {"report_id": report_id}
 
+    except HTTPException:
+        raise
     except Exception as e:
         end_time = datetime.now()
         duration = end_time - start_time
-        logger.exception(f"Fact analysis failed after :: {duration} : {e}")
+        logger.exception(f"Fact analysis failed after :: {duration} (request_id: {get_request_id()}) : {e}")
         raise HTTPException(status_code=500, detail=str(e))
     
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@fact_analysis_router.post("/fact-analysis/stream")
+async def fact_analysis_streaming(article_id : str, email : str, force_refresh : bool = False, profile : ProfileName = DEFAULT_MODEL_PROFILE):
+    article = await article_repository.get_by_article_id(article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    async def save_report(report_id):
+        await article_repository.push_report(article_id, report_id, email)
+
+    async def event_stream():
+        start_time = datetime.now()
+        logger.info(f"Streaming fact analysis started at {start_time} for article_id: {article_id}, request_id: {get_request_id()}")
+        try:
+            # The analysis runs detached from this generator, so a disconnect cannot cancel it
+            async for event, data in fact_analysis_stream_detached(article, force_refresh=force_refresh, profile=profile, on_done=save_report):
+                if event == "claim" and start_time is not None:
+                    logger.info(f"First claim streamed after {datetime.now() - start_time} for article_id: {article_id}")
+                    start_time = None
+                yield format_sse(event, data)
+        except Exception as e:
+            logger.exception(f"Streaming fact analysis failed for article_id {article_id}: {e}")
+            yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    
 @fact_analysis_router.put('/set-save')
-async def update_save_settings(settings: str, article_id: str, report_id: str):
+async def update_save_settings(settings: str, article_id: str, report_id: str, email: str):
     try:
         # Find the article by article_id
-        article = daily_articles_collection.find_one({"article_id": article_id})
+        article = await article_repository.get_by_article_id(article_id)
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
 
         # Update the settings for the specific report in the reports array
-        result = daily_articles_collection.update_one(
-            {
-                "article_id": article_id,
-                "reports.report_id": report_id
-            },
-            {
-                "$set": {
-                    "reports.$.settings": settings
-                }
-            }
-        )
-
-        if result.matched_count == 0:
+        matched_count = await article_repository.set_report_settings(article_id, report_id, email, settings)
+
+        if matched_count == 0:
             raise HTTPException(status_code=404, detail="Report not found")
 
+        # Keep the materialized public feed in step with the report's visibility
+        if settings == "public":
+            await publish_report(article, report_id, email)
+        else:
+            await unpublish_report(report_id, email)
+
         return {"message": "Settings updated successfully"}
     
     except Exception as e:
         logger.exception(f"Error occurred while saving settings, {e}")
-        raise HTTPException(status_code=500, detail=str(e))   
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))   
+
+@fact_analysis_router.post('/fact-analysis/batch')
+async def fact_analysis_batch(req: BatchAnalysisRequest):
+    try:
+        batch_id, total = await start_batch(**req.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Failed to start batch fact analysis: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start batch fact analysis")
+    return {"batch_id": batch_id, "total": total}
+
+@fact_analysis_router.get('/fact-analysis/batch/{batch_id}')
+async def fact_analysis_batch_progress(batch_id: str, status: Optional[str] = None):
+    try:
+        batch = await get_batch_progress(batch_id, status=status)
+    except Exception as e:
+        logger.exception(f"Failed to read batch {batch_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to read batch progress")
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
\ No newline at end of file
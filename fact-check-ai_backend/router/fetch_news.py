@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from models.models import NewsRequest, CustomSearchRequest
-from utils.fetch_news import fetch_and_store_articles, custom_search_articles, get_all_articles_util, get_todays_news_util, fetch_topics
-from config.db import report_collection, daily_articles_collection
+from utils.fetch_news import fetch_and_store_articles, custom_search_articles, get_articles_page, stream_articles, get_todays_news_util, has_recent_articles, fetch_topics
+from utils.repository import article_repository, report_repository
+from config.constants import ARTICLE_PAGE_SIZE, ARTICLE_PAGE_SIZE_MAX, REPORT_SUMMARY_PAGE_SIZE, REPORT_SUMMARY_PAGE_SIZE_MAX, PUBLIC_FEED_PAGE_SIZE, PUBLIC_FEED_PAGE_SIZE_MAX
+from utils.public_feed import get_public_feed_page
+from bson import ObjectId
+from typing import Literal, Optional
+import asyncio
+import json
 import logging
-from datetime import datetime, timedelta
 
 
 logger = logging.getLogger(__name__)
@@ -15,12 +21,12 @@ fetch_news_router = APIRouter()
 def fetch_news(req: NewsRequest):
     logger.info(f"Initiating daily news fetch for date {req.date_str}")
     try:
-        fetch_and_store_articles(req.date_str, req.country, req.topics, req.page_size)
+        stats = fetch_and_store_articles(req.date_str, req.country, req.topics, req.page_size)
     except Exception as e:
         logger.error(f"Fetch process failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch and store articles")
     logger.info("News fetch and store operation completed")
-    return {"status": "success", "message": "Articles fetched and stored for today."}
+    return {"status": "success", "message": "Articles fetched and stored for today.", **stats}
 
 @fetch_news_router.post("/custom-search")
 def custom_search(req: CustomSearchRequest):
@@ -32,15 +38,49 @@ def custom_search(req: CustomSearchRequest):
         logger.error(f"Custom search API failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to perform custom search")
     
+def validate_cursor(cursor):
+    if cursor is not None and not ObjectId.is_valid(cursor):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Fields a caller may project with ?fields= on article listings: stored document fields and the
+# NewsAPI article fields nested under "article"
+ARTICLE_FIELDS = {"article_id", "title", "topic", "country", "date", "publishedAt", "analyzed", "reports", "article"}
+NEWSAPI_ARTICLE_FIELDS = {"source", "author", "title", "description", "url", "urlToImage", "publishedAt", "content"}
+ALLOWED_PROJECTION_FIELDS = ARTICLE_FIELDS | {f"article.{field}" for field in NEWSAPI_ARTICLE_FIELDS}
+
+def parse_fields(fields):
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - ALLOWED_PROJECTION_FIELDS)
+    if unknown:
+        # Anything else (e.g. $-prefixed keys) would make the projection itself fail in Mongo
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    # Projecting "article" together with "article.x" is a path collision; the parent covers both
+    return {field: 1 for field in requested if not (field.startswith("article.") and "article" in requested)}
+
+async def ndjson_lines(documents):
+    async for document in documents:
+        yield json.dumps(document, default=str) + "\n"
+
 @fetch_news_router.get("/get-all-articles")
-async def get_all_articles():
+async def get_all_articles(
+    cursor: Optional[str] = None,
+    limit: int = Query(ARTICLE_PAGE_SIZE, ge=1, le=ARTICLE_PAGE_SIZE_MAX),
+    fields: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+):
+    validate_cursor(cursor)
+    projection = parse_fields(fields)
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(stream_articles(cursor=cursor, projection=projection)), media_type="application/x-ndjson")
     try:
-        articles = await get_all_articles_util()
+        articles, next_cursor = await get_articles_page(cursor=cursor, limit=limit, projection=projection)
         logger.info(f"Fetched {len(articles)} articles from the database")
-        if not articles:
+        if not articles and cursor is None:
             logger.info("No articles found in the database")
             return {"status": "success", "message": "No articles found"}
-        return {"status": "success", "articles": articles}
+        return {"status": "success", "articles": articles, "next": next_cursor}
     except Exception as e:
         logger.error(f"Get all articles API failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch all articles")
@@ -71,21 +111,31 @@ async def get_topics(email):
         raise HTTPException(status_code=500, detail="Failed to fetch topics")
     
     
+TOPIC_ARTICLE_PROJECTION = {"article": 1, "article_id": 1, "analyzed": 1, "reports": 1}
+
+def flatten_topic_article(article):
+    return {**article.get("article", {}), "article_id": article.get("article_id"), "analyzed": article.get("analyzed", False), "reports": article.get("reports", [])}
+
+async def flatten_topic_articles(documents):
+    async for document in documents:
+        yield flatten_topic_article(document)
+
 @fetch_news_router.get('/get-news-by-topic')
-async def get_news_by_topics(topic: str):
+async def get_news_by_topics(
+    topic: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(ARTICLE_PAGE_SIZE, ge=1, le=ARTICLE_PAGE_SIZE_MAX),
+    format: Literal["json", "ndjson"] = "json",
+):
+    validate_cursor(cursor)
+    if format == "ndjson":
+        documents = stream_articles(topic=topic, cursor=cursor, projection=TOPIC_ARTICLE_PROJECTION)
+        return StreamingResponse(ndjson_lines(flatten_topic_articles(documents)), media_type="application/x-ndjson")
     try:
-        articles = await get_all_articles_util()
-        if topic.lower() == "all":
-            filtered_articles = articles
-        else:
-            filtered_articles = [article for article in articles if topic.lower() == article.get("topic", "").lower()]
-        
-        result_articles = [
-            {**article["article"], "article_id": article["article_id"], "analyzed": article.get("analyzed", False), "reports": article.get("reports", [])}
-            for article in filtered_articles
-        ]
+        articles, next_cursor = await get_articles_page(topic=topic, cursor=cursor, limit=limit, projection=TOPIC_ARTICLE_PROJECTION)
+        result_articles = [flatten_topic_article(article) for article in articles]
         
-        return {"status": "success", "articles": result_articles}
+        return {"status": "success", "articles": result_articles, "next": next_cursor}
     except Exception as e:
         logger.error(f"Get news by topic API failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch news by topic")
@@ -94,15 +144,11 @@ async def get_news_by_topics(topic: str):
 @fetch_news_router.get('/get-report')
 async def get_report(report_id: str, article_id : str):
     try:
-        article = daily_articles_collection.find_one(
-            {"article_id" : article_id},
-            {"_id" : 0}
+        article, report = await asyncio.gather(
+            article_repository.get_by_article_id(article_id, {"_id" : 0}),
+            report_repository.get_by_report_id(report_id, {"_id" : 0}),
         )
-        report = report_collection.find_one(
-            {"report_id": report_id},
-            {"_id" : 0}
-            )
-                    
+
         return {'report': report, "article" : article}
         
     except Exception as e:
@@ -112,127 +158,39 @@ async def get_report(report_id: str, article_id : str):
         )
 
 @fetch_news_router.get('/fetch-report-summary')
-async def get_report_summary(email: str):
-    articles = list(daily_articles_collection.find({
-        "reports": {
-            "$elemMatch": {
-                "analyzed": True,
-                "user_email": email
-            }
-        }
-    }, {'_id': 0}))
-    
-    summaries = []
-
-    for article in articles:
-        reports = article.get('reports', [])
-        for report_info in reports:
-            if not (report_info.get('analyzed') and report_info.get('user_email') == email):
-                continue
-                
-            report_id = report_info.get('report_id')
-            if not report_id:
-                continue
-                
-            report = report_collection.find_one({"report_id": report_id}, {'_id': 0})
-
-            if report:
-                claims = report.get('fact_check_report', {}).get('claims', [])
-                claim_counts = {
-                    "True": 0,
-                    "False": 0,
-                    "Unverifiable": 0,
-                    "Misleading": 0
-                }
-
-                for claim in claims:
-                    category = claim.get('fact_check_category')
-                    if category in claim_counts:
-                        claim_counts[category] += 1
-
-                summary = {
-                    "article": article,
-                    "report_id": report_id,
-                    "title": report.get('title'),
-                    "overall_category": report.get('fact_check_report', {}).get('overall_category'),
-                    "claim_counts": claim_counts,
-                    "notes": report.get('fact_check_report', {}).get('notes'),
-                    "category": report.get('fact_check_report', {}).get('category')
-                }
-                summaries.append(summary)
-
-    return {"status": "success", "articles": summaries}
+async def get_report_summary(
+    email: str,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(REPORT_SUMMARY_PAGE_SIZE, ge=1, le=REPORT_SUMMARY_PAGE_SIZE_MAX),
+):
+    try:
+        summaries, has_more = await article_repository.report_summaries(email, skip=(page - 1) * page_size, limit=page_size)
+        return {"status": "success", "articles": summaries, "page": page, "page_size": page_size, "has_more": has_more}
+    except Exception as e:
+        logger.error(f"Fetch report summary failed for {email}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch report summary")
 
 @fetch_news_router.get('/get-published-reports')
-async def get_published_reports():
+async def get_published_reports(
+    cursor: Optional[str] = None,
+    limit: int = Query(PUBLIC_FEED_PAGE_SIZE, ge=1, le=PUBLIC_FEED_PAGE_SIZE_MAX),
+):
     try:
-        public_reports_cursor = daily_articles_collection.find(
-            {"reports.settings": "public"},
-            {"reports": 1, "article_id": 1, "article": 1, "_id": 0}
-        )
-
-        result = []
-        
-        for doc in public_reports_cursor:
-            if "reports" in doc:
-                for report in doc["reports"]:
-                    if report.get("settings") == "public":
-                        report_data = report_collection.find_one(
-                            {"report_id": report["report_id"]},
-                            {
-                                "fact_check_report": 1,
-                                "source_report": 1,
-                                "title": 1,
-                                "questions": 1,
-                                "images": 1,
-                                "_id": 0
-                            }
-                        )
-                        
-                        if report_data:
-                            result.append({
-                                "report_id": report["report_id"],
-                                "article_id": doc.get("article_id"),
-                                "article": doc.get("article"),
-                                "user_email": report.get("user_email"),
-                                "settings": report.get("settings"),
-                                "title": report_data.get("title"),
-                                "fact_check_report": report_data.get("fact_check_report"),
-                                "source_report": report_data.get("source_report") or [],
-                                "questions": report_data.get("questions") or [],
-                                "images": report_data.get("images") or []
-                            })
-
-        return {"reports": result}
+        # Served from the public feed collection maintained by /set-save
+        reports, next_cursor = await get_public_feed_page(cursor=cursor, limit=limit)
+    except (ValueError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Get public reports failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch public reports")
+    return {"reports": reports, "next": next_cursor}
 
 
 @fetch_news_router.get('/check-latest-news')
 async def check_latest_news(topic: str):
     try:
-        # Query to find all articles for the given topic
-        articles = daily_articles_collection.find(
-            {"topic": topic},
-            {"article.publishedAt": 1, "_id": 0}
-        )
-
-        # Get current UTC time and calculate the threshold (3 days ago)
-        current_date = datetime.utcnow()
-        three_days_ago = current_date - timedelta(days=3)
-
-        # Check if any article is within the last 3 days
-        has_recent_article = False
-        for article in articles:
-            if not article.get("article", {}).get("publishedAt"):
-                continue
-            published_date = datetime.strptime(
-                article["article"]["publishedAt"], "%Y-%m-%dT%H:%M:%SZ"
-            )
-            if published_date >= three_days_ago:
-                has_recent_article = True
-                break
+        # Indexed range query on (topic, publishedAt) for any article from the last 3 days
+        has_recent_article = await has_recent_articles(topic, days=3)
 
         # Return response with is_latest and fetch_enabled flags
         response = {
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from utils.metrics import registry, register_cache
+from utils.auth_util import firebase_user_cache
+from config.secrets import secret_cache
+
+
+metrics_router = APIRouter()
+
+register_cache(secret_cache)
+register_cache(firebase_user_cache)
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -4,38 +4,80 @@ import jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from firebase_admin import auth, exceptions
-from config.constants import JWT_SECRET, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from config.db import users_collection
+from config.constants import JWT_SECRET_NAME, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, ADMIN_EMAILS, FIREBASE_USER_CACHE_TTL_SECONDS, FIREBASE_UNVERIFIED_USER_TTL_SECONDS, FIREBASE_USER_NEGATIVE_TTL_SECONDS
+from utils.repository import user_repository
 from models.models import TokenData
-from config.auth import firebase_app
+from config.auth import get_firebase_app
+from config.secrets import get_secret, aget_secret
+from utils.ttl_cache import TTLCache
+from starlette.concurrency import run_in_threadpool
 import logging
 
 logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+firebase_user_cache = TTLCache(
+    "firebase_user",
+    default_ttl=FIREBASE_USER_CACHE_TTL_SECONDS,
+    negative_ttl=FIREBASE_USER_NEGATIVE_TTL_SECONDS,
+    negative_exceptions=(exceptions.NotFoundError,),
+)
+
+def _firebase_user_ttl(user):
+    # Verification pollers must see email_verified flip quickly
+    return FIREBASE_USER_CACHE_TTL_SECONDS if user.email_verified else FIREBASE_UNVERIFIED_USER_TTL_SECONDS
+
+def _load_user_by_email(email):
+    user = auth.get_user_by_email(email, app=get_firebase_app())
+    firebase_user_cache.set(f"uid:{user.uid}", user, ttl=_firebase_user_ttl)
+    return user
+
+def _load_user_by_uid(uid):
+    user = auth.get_user(uid, app=get_firebase_app())
+    firebase_user_cache.set(f"email:{user.email}", user, ttl=_firebase_user_ttl)
+    return user
+
+def get_firebase_user_by_email(email: str):
+    return firebase_user_cache.get(f"email:{email}", lambda: _load_user_by_email(email), ttl=_firebase_user_ttl)
+
+def get_firebase_user_by_uid(uid: str):
+    return firebase_user_cache.get(f"uid:{uid}", lambda: _load_user_by_uid(uid), ttl=_firebase_user_ttl)
+
+async def aget_firebase_user_by_email(email: str):
+    # Cache hits return immediately; only a miss goes to Firebase, off the event loop
+    if firebase_user_cache.peek(f"email:{email}")[0]:
+        return get_firebase_user_by_email(email)
+    return await run_in_threadpool(get_firebase_user_by_email, email)
+
+def invalidate_firebase_user(email: str = None, uid: str = None):
+    if email:
+        firebase_user_cache.invalidate(f"email:{email}")
+    if uid:
+        firebase_user_cache.invalidate(f"uid:{uid}")
+
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
 def check_user_exists(email: str) -> bool:
     try:
-        auth.get_user_by_email(email)
+        get_firebase_user_by_email(email)
         return True
     except exceptions.NotFoundError:
         return False
 
-def get_user_from_db(email: str):
-    return users_collection.find_one({"email": email})
+async def get_user_from_db(email: str):
+    return await user_repository.get_by_email(email)
 
 def create_access_token(data: dict, expires_delta=None):
     to_encode = data.copy()
     expire = datetime.datetime.utcnow() + (expires_delta or datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire, "iat": datetime.datetime.utcnow()})
-    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return jwt.encode(to_encode, get_secret(JWT_SECRET_NAME), algorithm=JWT_ALGORITHM)
 
 async def verify_token(token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, await aget_secret(JWT_SECRET_NAME), algorithms=[JWT_ALGORITHM])
         uid = payload.get("uid")
         email = payload.get("email")
         if not uid or not email:
@@ -43,10 +85,15 @@ async def verify_token(token: str = Depends(oauth2_scheme)):
         return TokenData(uid=uid, email=email)
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+
+async def verify_admin(token_data: TokenData = Depends(verify_token)):
+    if token_data.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return token_data
     
 async def check_email_verification(email: str):
     try:
-        user = auth.get_user_by_email(email)
+        user = await aget_firebase_user_by_email(email)
         if not user.email_verified:
             return False
         return True
@@ -56,9 +103,11 @@ async def check_email_verification(email: str):
 
 async def update_user_profile(uid: str, display_name: str):
     try:
-        auth.update_user(
-            uid=uid,
+        await run_in_threadpool(
+            auth.update_user,
+            uid,
             display_name=display_name,
+            app=get_firebase_app(),
         )
     except exceptions.FirebaseError as e:
         logger.error(f"Firebase error updating user {uid}: {e}")
@@ -0,0 +1,163 @@
+from contextvars import Context
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import uuid
+
+from config.constants import BATCH_MAX_ITEMS, BATCH_MAX_CONCURRENCY, BATCH_HEARTBEAT_SECONDS
+from config.model_configs import get_model_profile
+from utils.fact_analysis import fact_analysis_coalesced
+from utils.repository import article_repository, batch_repository
+
+logger = logging.getLogger(__name__)
+
+# Strong references to running batch tasks; the event loop only keeps weak ones
+running_batches = {}
+_orphan_sweep = None
+
+
+async def resolve_article_ids(article_ids=None, topic=None, date_str=None, email=None, skip_analyzed=True):
+    if article_ids:
+        return list(dict.fromkeys(article_ids))
+    if not topic or not date_str:
+        raise ValueError("Either article_ids or topic and date_str are required")
+    day_start = datetime.strptime(date_str, "%Y-%m-%d")
+    return await article_repository.ids_for_topic_and_day(
+        topic, day_start, day_start + timedelta(days=1), exclude_email=email if skip_analyzed else None
+    )
+
+
+async def analyze_item(batch_id, index, article_id, email, force_refresh, profile):
+    await batch_repository.set_item(batch_id, index, {"status": "running", "started_at": datetime.utcnow()})
+    try:
+        article = await article_repository.get_by_article_id(article_id)
+        if article is None:
+            await batch_repository.set_item(batch_id, index, {"status": "not_found", "finished_at": datetime.utcnow()}, counter="failed")
+            return
+        report_id = await fact_analysis_coalesced(article, force_refresh=force_refresh, profile=profile)
+        if not report_id:
+            raise RuntimeError("Fact analysis produced no report")
+        # Same reports entry as /fact-analysis, written as soon as this article is done
+        await article_repository.push_report(article_id, report_id, email)
+        await batch_repository.set_item(batch_id, index, {"status": "completed", "report_id": report_id, "finished_at": datetime.utcnow()}, counter="completed")
+    except Exception as e:
+        logger.exception(f"Batch {batch_id}: analysis failed for article_id {article_id}: {e}")
+        await batch_repository.set_item(batch_id, index, {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()}, counter="failed")
+
+
+def heartbeat_cutoff():
+    return datetime.utcnow() - timedelta(seconds=3 * BATCH_HEARTBEAT_SECONDS)
+
+
+async def heartbeat(batch_id):
+    # Batches only run inside the worker that started them; the heartbeat tells other workers
+    # (and this one after a restart) that the batch is still being worked on
+    while True:
+        await asyncio.sleep(BATCH_HEARTBEAT_SECONDS)
+        try:
+            await batch_repository.set_fields(batch_id, {"heartbeat_at": datetime.utcnow()})
+        except Exception as e:
+            logger.warning(f"Batch {batch_id}: heartbeat failed: {e}")
+
+
+async def interrupt_orphaned_batches():
+    # Batches left running by a restarted or crashed worker never finish on their own
+    interrupted = await batch_repository.interrupt_stale(heartbeat_cutoff())
+    if interrupted:
+        logger.warning(f"Marked {interrupted} orphaned batches as interrupted")
+    return interrupted
+
+
+def start_orphan_sweep():
+    # Called on app startup. Batches of the worker this one replaced only go stale after the
+    # heartbeat window, so the sweep repeats instead of running once
+    global _orphan_sweep
+    if _orphan_sweep is None:
+        _orphan_sweep = asyncio.create_task(watch_orphaned_batches())
+
+
+async def watch_orphaned_batches():
+    while True:
+        try:
+            await interrupt_orphaned_batches()
+        except Exception as e:
+            logger.exception(f"Orphaned batch sweep failed: {e}")
+        await asyncio.sleep(3 * BATCH_HEARTBEAT_SECONDS)
+
+
+async def run_batch(batch_id, article_ids, email, force_refresh, profile, max_concurrency):
+    semaphore = asyncio.Semaphore(max_concurrency)
+    beat = asyncio.create_task(heartbeat(batch_id))
+
+    async def bounded(index, article_id):
+        async with semaphore:
+            await analyze_item(batch_id, index, article_id, email, force_refresh, profile)
+
+    try:
+        await asyncio.gather(*(bounded(index, article_id) for index, article_id in enumerate(article_ids)))
+        batch = await batch_repository.get_by_batch_id(batch_id)
+        status = "completed_with_errors" if batch and batch["counts"]["failed"] else "completed"
+        await batch_repository.set_fields(batch_id, {"status": status, "finished_at": datetime.utcnow()})
+        logger.info(f"Batch {batch_id} {status}: {len(article_ids)} articles")
+    except Exception as e:
+        logger.exception(f"Batch {batch_id} aborted: {e}")
+        await batch_repository.set_fields(batch_id, {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()})
+    finally:
+        beat.cancel()
+        running_batches.pop(batch_id, None)
+
+
+async def start_batch(email, article_ids=None, topic=None, date_str=None, force_refresh=False, skip_analyzed=True, profile=None, max_concurrency=None):
+    profile = get_model_profile(profile).name
+    article_ids = await resolve_article_ids(article_ids, topic, date_str, email, skip_analyzed)
+    if len(article_ids) > BATCH_MAX_ITEMS:
+        raise ValueError(f"Batch of {len(article_ids)} articles exceeds BATCH_MAX_ITEMS ({BATCH_MAX_ITEMS})")
+    max_concurrency = min(max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+
+    batch_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    await batch_repository.insert_one({
+        "batch_id": batch_id,
+        "email": email,
+        "topic": topic,
+        "date_str": date_str,
+        "profile": profile,
+        "force_refresh": force_refresh,
+        "max_concurrency": max_concurrency,
+        "status": "running" if article_ids else "completed",
+        "total": len(article_ids),
+        "counts": {"completed": 0, "failed": 0},
+        "items": [{"article_id": article_id, "status": "pending"} for article_id in article_ids],
+        "created_at": now,
+        "heartbeat_at": now,
+        "finished_at": None if article_ids else now,
+    })
+    if article_ids:
+        # Fresh context: the batch outlives the request, so it must not attach spans to its trace
+        running_batches[batch_id] = asyncio.create_task(
+            run_batch(batch_id, article_ids, email, force_refresh, profile, max_concurrency), context=Context()
+        )
+    logger.info(f"Batch {batch_id} started: {len(article_ids)} articles, concurrency {max_concurrency}, profile {profile}")
+    return batch_id, len(article_ids)
+
+
+async def get_batch_progress(batch_id, status=None):
+    batch = await batch_repository.get_by_batch_id(batch_id)
+    if batch is None:
+        return None
+    if batch["status"] == "running" and batch_id not in running_batches and batch.get("heartbeat_at", batch["created_at"]) < heartbeat_cutoff():
+        # Orphaned since the last sweep (its worker died): settle it now rather than on the next sweep
+        if await batch_repository.interrupt_stale(heartbeat_cutoff(), batch_id=batch_id):
+            batch = await batch_repository.get_by_batch_id(batch_id)
+    done = batch["counts"]["completed"] + batch["counts"]["failed"]
+    elapsed = ((batch.get("finished_at") or datetime.utcnow()) - batch["created_at"]).total_seconds()
+    items = batch.pop("items")
+    batch["progress"] = {
+        "done": done,
+        "pending": batch["total"] - done,
+        "running": sum(1 for item in items if item["status"] == "running"),
+        "elapsed_s": round(elapsed, 1),
+        "articles_per_min": round(done / elapsed * 60, 2) if elapsed > 0 else 0.0,
+    }
+    batch["items"] = [item for item in items if status is None or item["status"] == status]
+    return batch
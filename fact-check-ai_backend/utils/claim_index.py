@@ -0,0 +1,185 @@
+"""Index of past claim verdicts, so articles repeating a story start from earlier fact checks.
+
+Every stored report adds its claims (text, category, sources, raw article excerpts) to the
+claim_verdicts collection, keyed by the normalized claim text. verified_at/verified_report_id
+record the LLM run that actually verified a claim; claims carried over from a prior verdict
+keep that verdict's provenance (reused_from) so they still expire with it. Near-duplicates are found in
+two steps: MinHash LSH band keys over word shingles select candidates through an index, then
+TF-IDF cosine similarity between the new article's sentences and each candidate decides
+which verdicts are close enough to be handed to the model as prior evidence.
+"""
+from datetime import datetime, timedelta
+import hashlib
+import logging
+import re
+
+import numpy as np
+from pymongo import UpdateOne
+
+from config.constants import CLAIM_VERDICT_TTL_DAYS, CLAIM_MATCH_THRESHOLD, CLAIM_PRIOR_MAX
+from utils.relevance import similarity_matrix
+from utils.repository import claim_index_repository
+from utils.metrics import claim_index_matches
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 2
+# 16 bands of 4 rows: pairs above ~0.5 Jaccard similarity share a band with high probability
+LSH_BANDS = 16
+LSH_ROWS = 4
+MINHASH_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)
+_MINHASH_A = _rng.integers(1, MINHASH_PRIME, LSH_BANDS * LSH_ROWS, dtype=np.int64)
+_MINHASH_B = _rng.integers(0, MINHASH_PRIME, LSH_BANDS * LSH_ROWS, dtype=np.int64)
+# Candidates fetched per article before the TF-IDF rerank
+CANDIDATE_LIMIT = 200
+# Sentences shorter than this carry too little to match a claim on
+MIN_SENTENCE_WORDS = 5
+
+
+def normalize_claim(text):
+    return " ".join(re.findall(r"[a-z0-9]+", (text or "").lower()))
+
+
+def claim_hash(text):
+    return hashlib.sha256(normalize_claim(text).encode()).hexdigest()
+
+
+def _shingles(normalized):
+    words = normalized.split()
+    if len(words) < SHINGLE_SIZE:
+        return set(words)
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def lsh_keys(text):
+    shingles = _shingles(normalize_claim(text))
+    if not shingles:
+        return []
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little") % MINHASH_PRIME for shingle in shingles],
+        dtype=np.int64,
+    )
+    # a * x stays below 2^62, so the universal hash never overflows int64
+    signature = ((_MINHASH_A[:, None] * hashes[None, :] + _MINHASH_B[:, None]) % MINHASH_PRIME).min(axis=1)
+    return [
+        f"{band}:{hashlib.blake2b(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(LSH_BANDS)
+    ]
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+|\n+", text or "") if len(sentence.split()) >= MIN_SENTENCE_WORDS]
+
+
+def _match_text(entry):
+    return " ".join([entry["claim"]] + list(entry.get("raw_content") or []))
+
+
+def _reused_verdicts(claims, prior_verdicts, threshold=CLAIM_MATCH_THRESHOLD):
+    # Claim index -> prior verdict the model carried over (same category, near-identical text)
+    if not claims or not prior_verdicts:
+        return {}
+    scores = similarity_matrix([claim["claim"] for claim in claims], [prior["claim"] for prior in prior_verdicts])
+    reused = {}
+    for index, claim in enumerate(claims):
+        for prior_index in np.argsort(-scores[index]):
+            prior = prior_verdicts[prior_index]
+            if scores[index][prior_index] < threshold:
+                break
+            if prior.get("fact_check_category") == claim.get("fact_check_category"):
+                reused[index] = prior
+                break
+    return reused
+
+
+async def index_claims(fact_check_report, report_id, article_url=None, prior_verdicts=None):
+    # Only claims the model verified itself get verified_at = now. A claim carried over from a
+    # prior verdict keeps that verdict's verification time and report, so reuse never renews
+    # a verdict past CLAIM_VERDICT_TTL_DAYS.
+    if CLAIM_VERDICT_TTL_DAYS <= 0 or not isinstance(fact_check_report, dict):
+        return
+    claims = [claim for claim in fact_check_report.get("claims") or [] if normalize_claim(claim.get("claim"))]
+    reused = _reused_verdicts(claims, prior_verdicts)
+    operations = []
+    now = datetime.utcnow()
+    for index, claim in enumerate(claims):
+        text = claim["claim"]
+        raw_content = [excerpt for excerpt in claim.get("raw_content") or [] if isinstance(excerpt, str)]
+        keys = set(lsh_keys(text))
+        for excerpt in raw_content:
+            keys.update(lsh_keys(excerpt))
+        entry = {
+            "claim_hash": claim_hash(text),
+            "claim": text,
+            "fact_check_category": claim.get("fact_check_category"),
+            "sources": [{"url": source.get("url"), "source": source.get("source")} for source in claim.get("sources") or []],
+            "raw_content": raw_content,
+            "lsh": sorted(keys),
+            "report_id": report_id,
+            "article_url": article_url,
+        }
+        prior = reused.get(index)
+        if prior is None:
+            update = {"$set": {**entry, "verified_at": now, "verified_report_id": report_id, "reused_from": None}}
+        else:
+            # Never overwrite an existing entry (possibly verified independently) with a copy
+            update = {"$setOnInsert": {
+                **entry,
+                "verified_at": prior["verified_at"],
+                "verified_report_id": prior.get("verified_report_id") or prior.get("report_id"),
+                "reused_from": prior["claim_hash"],
+            }}
+        operations.append(UpdateOne({"claim_hash": entry["claim_hash"]}, update, upsert=True))
+    if not operations:
+        return
+    try:
+        await claim_index_repository.bulk_write(operations, ordered=False)
+        logger.info(f"Indexed {len(operations) - len(reused)} verified and {len(reused)} reused claims of report {report_id}")
+    except Exception as e:
+        logger.exception(f"Failed to index claims of report {report_id}: {str(e)}")
+
+
+async def find_prior_verdicts(article, threshold=CLAIM_MATCH_THRESHOLD, limit=CLAIM_PRIOR_MAX, ttl_days=CLAIM_VERDICT_TTL_DAYS):
+    # Returns [{claim_hash, claim, fact_check_category, sources, similarity, verified_at, verified_report_id}], best match first
+    if ttl_days <= 0 or limit <= 0:
+        return []
+    sentences = split_sentences(f"{article.get('title') or ''}.\n{article.get('description') or ''}")
+    keys = sorted({key for sentence in sentences for key in lsh_keys(sentence)})
+    if not keys:
+        return []
+    try:
+        candidates = await claim_index_repository.find_many(
+            {"lsh": {"$in": keys}, "verified_at": {"$gte": datetime.utcnow() - timedelta(days=ttl_days)}},
+            {"_id": 0, "claim_hash": 1, "claim": 1, "fact_check_category": 1, "sources": 1, "raw_content": 1, "verified_at": 1,
+             "article_url": 1, "report_id": 1, "verified_report_id": 1},
+            sort=[("verified_at", -1)],
+            limit=CANDIDATE_LIMIT,
+        )
+    except Exception as e:
+        logger.exception(f"Claim index lookup failed: {str(e)}")
+        return []
+    # A claim is never evidence for the article it was extracted from
+    candidates = [entry for entry in candidates if not article.get("url") or entry.get("article_url") != article.get("url")]
+    if not candidates:
+        return []
+
+    scores = similarity_matrix(sentences, [_match_text(entry) for entry in candidates]).max(axis=0)
+    ranked = sorted(zip(scores, range(len(candidates))), reverse=True)
+    matches = []
+    for score, index in ranked[:limit]:
+        if score < threshold:
+            break
+        entry = candidates[index]
+        matches.append({
+            "claim_hash": entry["claim_hash"],
+            "claim": entry["claim"],
+            "fact_check_category": entry.get("fact_check_category"),
+            "sources": entry.get("sources") or [],
+            "similarity": round(float(score), 3),
+            "verified_at": entry["verified_at"],
+            "verified_report_id": entry.get("verified_report_id") or entry.get("report_id"),
+        })
+        claim_index_matches.inc(category=entry.get("fact_check_category") or "unknown")
+    logger.info(f"Claim index: {len(candidates)} candidates, {len(matches)} prior verdicts")
+    return matches
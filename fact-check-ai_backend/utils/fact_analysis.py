@@ -1,21 +1,40 @@
 from llama_index.llms.perplexity import Perplexity
-from llama_index.core.llms import ChatMessage
 
-from config.model_configs import SONAR_PRO_MODEL_DEFAULTS
-from prompts.fact_analysis_prompt import FACT_CHECK_SYSTEM_PROMPT, FACT_CHECK_USER_PROMPT
-from prompts.source_ranker import SOURCE_ANALYSIS_SYSTEM_PROMPT, SOURCE_ANALYSIS_USER_PROMPT
-from models.fact_analysis_model import report_format, source_format
-from config.constants import PPLX_API_KEY
-from utils.utils import format_response
-from config.db import report_collection
+from config.model_configs import get_model_profile
+from config.secrets import aget_secret
+from config.constants import PPLX_API_KEY_NAME, PPLX_API_BASE, FACT_ANALYSIS_MAX_CONCURRENCY
+from utils.utils import format_response, log_payload
+from utils.tracing import trace_span
+from utils.single_flight import SingleFlight
+from utils.report_cache import get_content_hash, find_cached_report_id
+from utils.source_cache import normalize_url, get_cached_verifications, store_verifications
+from utils.json_stream import JsonArrayItemStreamer
+from utils.repository import report_repository
+from utils.metrics import fact_analysis_stage_seconds, fact_analysis_retries
+from utils.rate_limiter import perplexity_limiter, upstream_wait
+from utils.claim_index import find_prior_verdicts, index_claims
+from utils.prompt_builder import build_fact_check_messages, build_source_messages, record_usage, summarize_usage, COMPACT_REPORT_FORMAT, COMPACT_SOURCE_FORMAT
 
-from config.db import topics_collection
+from datetime import datetime
+import asyncio
 import logging
 import tenacity
+import time
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# Bounds the number of in-flight analyses (and therefore open upstream connections) per worker
+analysis_semaphore = asyncio.Semaphore(FACT_ANALYSIS_MAX_CONCURRENCY)
+# Concurrent analyses of the same article_id and profile share one pipeline run and one report
+analysis_flight = SingleFlight()
+# Strong references to detached stream producers; the event loop only keeps weak ones
+stream_producers = set()
+
+
+def count_retry(retry_state):
+    fact_analysis_retries.inc(call=retry_state.fn.__name__)
+
 
 def get_metadata(article):
     try:
@@ -29,33 +48,60 @@ def get_metadata(article):
         logger.exception(f"Failed to get metadata from article: {str(e)}")
         raise e
     
-@tenacity.retry(stop=tenacity.stop_after_attempt(3), wait=tenacity.wait_fixed(1))
-def fact_analysis_build(metadata, model_default):
+def get_fact_check_messages(article, prior_verdicts=None):
+    return build_fact_check_messages(article, get_metadata, prior_verdicts=prior_verdicts)
+
+async def lookup_prior_verdicts(article):
+    # Fresh verdicts on the same claims from other articles, given to the model as evidence
+    with trace_span("claim_index.lookup") as span, fact_analysis_stage_seconds.time(stage="claim_lookup"):
+        prior_verdicts = await find_prior_verdicts(article)
+        span.set(matches=len(prior_verdicts))
+    return prior_verdicts
+
+# Failures are re-raised so tenacity actually retries (after Retry-After or a jittered backoff);
+# once attempts are exhausted the retry_error_callback returns the same empty result the pipeline
+# has always handled. Every attempt takes a token from the shared Perplexity rate limiter.
+@tenacity.retry(stop=tenacity.stop_after_attempt(3), wait=upstream_wait, before_sleep=count_retry,
+                retry_error_callback=lambda retry_state: (None, None, None, None))
+async def fact_analysis_build(article, profile, usage=None, prior_verdicts=None):
     try:
-        messages_dict = [
-            {"role": "system", "content": FACT_CHECK_SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": FACT_CHECK_USER_PROMPT.format(article_metadata=metadata),
-            },]
-
-        messages = [ChatMessage(**msg) for msg in messages_dict]
-        model_default['response_format']['json_schema']['schema'] = report_format
-        model_default['return_images'] = True
-        model_default['return_related_questions'] = True
-        llm = Perplexity(api_key=PPLX_API_KEY, model="sonar-pro", additional_kwargs=model_default,)
-        response = llm.chat(messages)
-        images = response.model_dump()['raw']['images']
-        questions = response.model_dump()['raw']['related_questions']
+        messages, estimated_tokens = get_fact_check_messages(article, prior_verdicts)
+        llm = Perplexity(api_key=await aget_secret(PPLX_API_KEY_NAME), api_base=PPLX_API_BASE, model=profile.model, additional_kwargs=profile.fact_check_kwargs(COMPACT_REPORT_FORMAT))
+        with trace_span("llm.fact_analysis", model=profile.model, profile=profile.name, estimated_input_tokens=estimated_tokens) as span, \
+                fact_analysis_stage_seconds.time(stage="fact_analysis_llm"):
+            async with perplexity_limiter.slot():
+                response = await llm.achat(messages)
+        images = response.model_dump()['raw'].get('images')
+        questions = response.model_dump()['raw'].get('related_questions')
         citations = response.model_dump()['raw']['citations']
-        print("****************************************************************************************")
-        print(response.model_dump()['raw']['citations'])
-        print("****************************************************************************************")
-        formatted_response = format_response(response=response.model_dump())
+        span.set(**record_usage(usage, "fact_analysis", response.model_dump()['raw'], estimated_tokens), citations=len(citations or []))
+        log_payload("Fact analysis citations", citations)
+        with fact_analysis_stage_seconds.time(stage="json_parse"):
+            formatted_response = format_response(response=response.model_dump())
         return formatted_response, images, questions, citations
     except Exception as e:
         logger.exception(f"Error during fact analysis: {str(e)}")
-        return None, None, None, None
+        raise
+
+async def fact_analysis_build_stream(article, profile, usage=None, prior_verdicts=None):
+    # Yields ("claim", claim) for every claim as soon as the model has closed its JSON object,
+    # then a single ("complete", (report, images, questions, citations)) once the stream ends.
+    messages, estimated_tokens = get_fact_check_messages(article, prior_verdicts)
+    llm = Perplexity(api_key=await aget_secret(PPLX_API_KEY_NAME), api_base=PPLX_API_BASE, model=profile.model, additional_kwargs=profile.fact_check_kwargs(COMPACT_REPORT_FORMAT, stream=True))
+    streamer = JsonArrayItemStreamer("claims")
+    raw = {}
+    start = time.perf_counter()
+    with trace_span("llm.fact_analysis", model=profile.model, profile=profile.name, stream=True, estimated_input_tokens=estimated_tokens) as span:
+        async with perplexity_limiter.slot():
+            async for chunk in await llm.astream_chat(messages):
+                raw = chunk.raw or raw
+                for claim in streamer.feed(chunk.delta or ""):
+                    yield "claim", claim
+        span.set(**record_usage(usage, "fact_analysis", raw, estimated_tokens))
+    fact_analysis_stage_seconds.observe(time.perf_counter() - start, stage="fact_analysis_llm")
+    with fact_analysis_stage_seconds.time(stage="json_parse"):
+        formatted_response = format_response(response={"message": {"content": streamer.text}})
+    yield "complete", (formatted_response, raw.get('images'), raw.get('related_questions'), raw.get('citations'))
     
 def get_sources(citations, article_url):
     try:
@@ -78,31 +124,85 @@ def extract_domain(url):
     domain = url.split("/")[0]
     return domain
 
-@tenacity.retry(stop=tenacity.stop_after_attempt(3), wait=tenacity.wait_fixed(1))
-def source_analysis(sources, model_default, article_url):
+@tenacity.retry(stop=tenacity.stop_after_attempt(3), wait=upstream_wait, before_sleep=count_retry,
+                retry_error_callback=lambda retry_state: None)
+async def source_analysis(sources, profile, article_url, usage=None):
     try:
-        messages_dict = [
-            {"role": "system", "content": SOURCE_ANALYSIS_SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": SOURCE_ANALYSIS_USER_PROMPT.format(sources=sources),
-            },]
-        print("**********************************************************************")
-        print(sources)
-        print("**********************************************************************")
-
-        messages = [ChatMessage(**msg) for msg in messages_dict]
-        model_default['response_format']['json_schema']['schema'] = source_format
-        model_default['search_domain_filter'] = [f"-{extract_domain(article_url)}"]
-        llm = Perplexity(api_key=PPLX_API_KEY, model="sonar-pro", additional_kwargs=model_default)
-        response = llm.chat(messages)
-        formatted_response = format_response(response=response.model_dump())
+        log_payload("Source analysis input", sources)
+        messages, estimated_tokens, selected = build_source_messages(sources)
+        additional_kwargs = profile.source_analysis_kwargs(COMPACT_SOURCE_FORMAT, extract_domain(article_url))
+        llm = Perplexity(api_key=await aget_secret(PPLX_API_KEY_NAME), api_base=PPLX_API_BASE, model=profile.model, additional_kwargs=additional_kwargs)
+        with trace_span("llm.source_analysis", model=profile.model, profile=profile.name, sources=len(selected), estimated_input_tokens=estimated_tokens) as span, \
+                fact_analysis_stage_seconds.time(stage="source_analysis_llm"):
+            async with perplexity_limiter.slot():
+                response = await llm.achat(messages)
+        span.set(**record_usage(usage, "source_analysis", response.model_dump()['raw'], estimated_tokens))
+        with fact_analysis_stage_seconds.time(stage="json_parse"):
+            formatted_response = format_response(response=response.model_dump())
         return formatted_response['sources']
     except Exception as e:
         logger.exception(f"Error during fact analysis: {str(e)}")
-        return None
+        raise
     
-def store_report(fact_analysis_report, images, questions, source_report, title):
+async def source_analysis_cached(sources, profile, article_url, usage=None):
+    # Verification sources seen recently are served from the per-URL cache; only unseen
+    # citations and the target article itself (whose analysis is report specific) go to the LLM.
+    cached = await get_cached_verifications([s["source"] for s in sources if s["type"] == "verification"])
+    pending = [s for s in sources if s["type"] == "target" or normalize_url(s["source"]) not in cached]
+    logger.info(f"Source cache: {len(sources) - len(pending)} hits, {len(pending)} sent for analysis")
+
+    # Results are matched to the source that was sent by prompt id, never by the URL the model
+    # echoes back (it may rewrite it); the sent URL is also the cache key they are stored under.
+    fresh_by_url = {}
+    if pending:
+        prompt_sources = [{**s, "id": idx} for idx, s in enumerate(pending)]
+        fresh = await source_analysis(sources=prompt_sources, profile=profile, article_url=article_url, usage=usage)
+        if fresh is None:
+            if not cached:
+                return None
+            fresh = []
+        fresh_by_id = {v.get("id"): v for v in fresh}
+        for prompt_id, source in enumerate(pending):
+            verification = fresh_by_id.get(prompt_id)
+            if verification and verification.get("type", source["type"]) == source["type"]:
+                fresh_by_url[normalize_url(source["source"])] = {**verification, "article_url": source["source"]}
+        await store_verifications({
+            url: verification for url, verification in fresh_by_url.items() if verification.get("type") == "verification"
+        })
+
+    merged = []
+    for source in sources:
+        key = normalize_url(source["source"])
+        verification = cached.get(key) if source["type"] == "verification" else None
+        verification = verification or fresh_by_url.get(key)
+        if verification:
+            merged.append({**verification, "id": len(merged), "type": source["type"]})
+    return merged
+
+CLAIM_CATEGORIES = ("True", "False", "Unverifiable", "Misleading")
+
+def build_report_summary(fact_analysis_report, title):
+    # Slim projection of a report served by /fetch-report-summary without loading the report
+    report = fact_analysis_report if isinstance(fact_analysis_report, dict) else {}
+    claim_counts = {category: 0 for category in CLAIM_CATEGORIES}
+    for claim in report.get('claims') or []:
+        category = claim.get('fact_check_category')
+        if category in claim_counts:
+            claim_counts[category] += 1
+    return {
+        "title": title,
+        "claim_counts": claim_counts,
+        "overall_category": report.get('overall_category'),
+        "category": report.get('category'),
+        "notes": report.get('notes'),
+    }
+
+async def store_report(fact_analysis_report, images, questions, source_report, title, content_hash=None, usage=None, profile=None, article_url=None, prior_verdicts=None):
+    # A failed build (retries exhausted) is never stored: it would be cached under content_hash
+    # and handed to every coalesced caller
+    if not isinstance(fact_analysis_report, dict):
+        logger.error(f"Not storing report for '{title}': fact analysis produced no report")
+        return None
     try:
         report_id = uuid.uuid4()
         report_data = {
@@ -112,28 +212,141 @@ def store_report(fact_analysis_report, images, questions, source_report, title):
             'images' : images,
             'questions' : questions,
             "source_report" : source_report,
-            
+            "summary": build_report_summary(fact_analysis_report, title),
+            "content_hash": content_hash,
+            "profile": profile.name if profile else None,
+            "usage": summarize_usage(usage or {}),
+            "prior_verdicts": len(prior_verdicts or []),
+            "created_at": datetime.utcnow(),
         }
-        report_collection.insert_one(report_data)
+        with fact_analysis_stage_seconds.time(stage="mongo_write"):
+            await report_repository.insert_one(report_data)
+            await index_claims(fact_analysis_report, str(report_id), article_url, prior_verdicts)
         logger.info(f"Report stored successfully with ID: {report_id}")
         return str(report_id)
     except Exception as e:
         logger.exception(f"Failed to store report: {str(e)}")
         return None
 
-def fact_analysis_base(article):
+async def fact_analysis_base(article, force_refresh=False, profile=None):
     try:
+        profile = get_model_profile(profile)
         article = article['article']
-        metadata = get_metadata(article=article)
-        
-        fact_analysis_report, images, questions, citations = fact_analysis_build(metadata=metadata, model_default=SONAR_PRO_MODEL_DEFAULTS)
-        article_url = article.get("url", "")
-        source_list = get_sources(citations, article_url)
-        source_report = source_analysis(sources=source_list, model_default=SONAR_PRO_MODEL_DEFAULTS, article_url=article_url)
-        report_id = store_report(fact_analysis_report, images, questions, source_report, article['title'])
+        with fact_analysis_stage_seconds.time(stage="metadata"):
+            metadata = get_metadata(article=article)
+            content_hash = get_content_hash(metadata, profile=profile.name)
+
+        if not force_refresh:
+            cached_report_id = await find_cached_report_id(content_hash)
+            if cached_report_id:
+                logger.info(f"Report cache hit, reusing report_id: {cached_report_id}")
+                return cached_report_id
+
+        usage = {}
+        prior_verdicts = await lookup_prior_verdicts(article)
+        async with analysis_semaphore:
+            fact_analysis_report, images, questions, citations = await fact_analysis_build(article=article, profile=profile, usage=usage, prior_verdicts=prior_verdicts)
+            if not isinstance(fact_analysis_report, dict):
+                logger.error(f"Fact analysis failed for '{article.get('title')}', no report stored")
+                return None
+            article_url = article.get("url", "")
+            source_list = get_sources(citations, article_url)
+            source_report = await source_analysis_cached(sources=source_list, profile=profile, article_url=article_url, usage=usage)
+        report_id = await store_report(fact_analysis_report, images, questions, source_report, article['title'], content_hash=content_hash,
+                                       usage=usage, profile=profile, article_url=article_url, prior_verdicts=prior_verdicts)
         logger.info(f"Fact analysis base completed")
         return report_id
          
     except Exception as e:
         logger.exception(f"failed to process request : {str(e)}")
-        raise e
\ No newline at end of file
+        raise e
+
+async def fact_analysis_coalesced(article, force_refresh=False, profile=None):
+    profile = get_model_profile(profile)
+    article_id = article.get('article_id')
+    if not article_id:
+        return await fact_analysis_base(article, force_refresh=force_refresh, profile=profile.name)
+    with trace_span("fact_analysis", article_id=article_id, profile=profile.name, force_refresh=force_refresh) as span:
+        # force_refresh callers never join a run that may answer from the report cache
+        report_id, shared = await analysis_flight.do(f"{article_id}:{profile.name}:{force_refresh}", fact_analysis_base, article, force_refresh=force_refresh, profile=profile.name)
+        span.set(shared=shared, report_id=report_id)
+    if shared:
+        logger.info(f"Reused in-flight fact analysis for article_id: {article_id}, report_id: {report_id}")
+    return report_id
+
+def get_report_overview(fact_analysis_report, images, questions, title):
+    overview = {"title": title, "images": images or [], "questions": questions or []}
+    if isinstance(fact_analysis_report, dict):
+        overview.update({key: value for key, value in fact_analysis_report.items() if key != "claims"})
+    return overview
+
+async def fact_analysis_stream(article, force_refresh=False, profile=None):
+    # Streaming variant of fact_analysis_base, yielding (event, data) pairs:
+    # claim* -> report -> sources -> done. The report is persisted exactly like the blocking path.
+    profile = get_model_profile(profile)
+    article = article['article']
+    with fact_analysis_stage_seconds.time(stage="metadata"):
+        metadata = get_metadata(article=article)
+        content_hash = get_content_hash(metadata, profile=profile.name)
+
+    if not force_refresh:
+        cached_report_id = await find_cached_report_id(content_hash)
+        cached_report = cached_report_id and await report_repository.get_by_report_id(cached_report_id)
+        if cached_report:
+            logger.info(f"Report cache hit, streaming stored report_id: {cached_report_id}")
+            fact_check_report = cached_report.get("fact_check_report") or {}
+            for claim in fact_check_report.get("claims", []):
+                yield "claim", claim
+            yield "report", get_report_overview(fact_check_report, cached_report.get("images"), cached_report.get("questions"), cached_report.get("title"))
+            yield "sources", {"sources": cached_report.get("source_report") or []}
+            yield "done", {"report_id": cached_report_id, "cached": True}
+            return
+
+    usage = {}
+    prior_verdicts = await lookup_prior_verdicts(article)
+    async with analysis_semaphore:
+        result = (None, None, None, None)
+        async for event, data in fact_analysis_build_stream(article=article, profile=profile, usage=usage, prior_verdicts=prior_verdicts):
+            if event == "claim":
+                yield event, data
+            else:
+                result = data
+        fact_analysis_report, images, questions, citations = result
+        if not isinstance(fact_analysis_report, dict):
+            logger.error(f"Streaming fact analysis failed for '{article.get('title')}', no report stored")
+            yield "error", {"detail": "Fact analysis failed"}
+            return
+        yield "report", get_report_overview(fact_analysis_report, images, questions, article['title'])
+
+        article_url = article.get("url", "")
+        source_list = get_sources(citations, article_url)
+        source_report = await source_analysis_cached(sources=source_list, profile=profile, article_url=article_url, usage=usage)
+        yield "sources", {"sources": source_report or []}
+
+    report_id = await store_report(fact_analysis_report, images, questions, source_report, article['title'], content_hash=content_hash,
+                                   usage=usage, profile=profile, article_url=article_url, prior_verdicts=prior_verdicts)
+    yield "done", {"report_id": report_id, "cached": False}
+
+async def fact_analysis_stream_detached(article, force_refresh=False, profile=None, on_done=None):
+    # fact_analysis_stream run in its own task that feeds a queue. A client disconnecting
+    # mid-stream only cancels this reader: the producer still stores the report and awaits
+    # on_done(report_id), so paid LLM output is never lost.
+    queue = asyncio.Queue()
+
+    async def produce():
+        try:
+            async for event, data in fact_analysis_stream(article, force_refresh=force_refresh, profile=profile):
+                if event == "done" and on_done and data.get("report_id"):
+                    await on_done(data["report_id"])
+                queue.put_nowait((event, data))
+        except Exception as e:
+            logger.exception(f"Streaming fact analysis failed for '{article.get('article', {}).get('title')}': {e}")
+            queue.put_nowait(("error", {"detail": str(e)}))
+        finally:
+            queue.put_nowait(None)
+
+    producer = asyncio.create_task(produce())
+    stream_producers.add(producer)
+    producer.add_done_callback(stream_producers.discard)
+    while (item := await queue.get()) is not None:
+        yield item
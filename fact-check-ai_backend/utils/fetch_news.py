@@ -1,84 +1,184 @@
-from datetime import datetime, timedelta
-from config.constants import NEWS_API_KEY
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta, timezone
+from config.constants import NEWS_API_KEY, NEWS_API_BASE, ARTICLE_BATCH_SIZE, NEWS_FETCH_WORKERS, NEWS_MAX_PAGES, ARTICLE_PAGE_SIZE
 from newsapi import NewsApiClient
-from config.db import daily_articles_collection, topics_collection, users_collection
+from newsapi import const as newsapi_const
+from pymongo import UpdateOne
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from config.db import daily_articles_collection
+from utils.repository import article_repository, topic_repository, user_repository
 import logging
+import math
+import requests
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from utils.relevance import relevance_scores
+from utils.metrics import newsapi_request_seconds
+from utils.rate_limiter import RateLimitedAdapter, newsapi_limiter
+from utils.tracing import trace_span, run_in_context
 import uuid
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# newsapi-python reads its endpoint URLs from module constants at call time
+newsapi_const.EVERYTHING_URL = f"{NEWS_API_BASE}/everything"
+
+# One keep-alive connection pool shared by every NewsAPI call in the process; every request
+# waits for a token from the shared NewsAPI rate limiter and 429/5xx responses are retried
+news_session = requests.Session()
+news_session.mount("https://", RateLimitedAdapter(newsapi_limiter, pool_connections=1, pool_maxsize=NEWS_FETCH_WORKERS))
+news_session.mount("http://", RateLimitedAdapter(newsapi_limiter, pool_connections=1, pool_maxsize=NEWS_FETCH_WORKERS))
+
+def observe_newsapi_response(response, *args, **kwargs):
+    newsapi_request_seconds.observe(response.elapsed.total_seconds(), status=response.status_code)
+
+news_session.hooks["response"].append(observe_newsapi_response)
+
 def get_news_client():
     try:
-        newsapi = NewsApiClient(api_key=NEWS_API_KEY)
+        newsapi = NewsApiClient(api_key=NEWS_API_KEY, session=news_session)
         logger.info("NewsAPI client initialized")
         return newsapi
     except Exception as e:
         logger.error(f"Failed to initialize NewsAPI client: {e}")
         raise
 
-def store_articles(date_str, country, topic, articles):
-    for article in articles:
+def parse_published_at(value):
+    # NewsAPI sends ISO-8601 UTC strings ("2025-01-01T10:00:00Z"); stored as naive UTC datetimes
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+    except ValueError:
         try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+        except ValueError:
+            logger.warning(f"Unparseable publishedAt: {value}")
+            return None
+
+def store_articles(date_str, country, topic, articles, batch_size=ARTICLE_BATCH_SIZE):
+    # Upserts on the unique title index: existing titles are left untouched, new ones inserted,
+    # one round trip per batch instead of two per article.
+    batches = []
+    for start in range(0, len(articles), batch_size):
+        operations = []
+        for article in articles[start:start + batch_size]:
             title = article.get("title")
             if not title:
                 logger.warning(f"Article missing title, skipping: {article}")
                 continue
-            if daily_articles_collection.find_one({"title": title}):
-                logger.info(f"Duplicate article found, skipping: {title}")
-                continue
-            id_uuid = str(uuid.uuid4())
             document = {
-                "article_id" : id_uuid,
+                "article_id" : str(uuid.uuid4()),
                 "date": date_str,
                 "country": country,
                 "topic": topic,
                 "article": article,
-                "title": title
+                "title": title,
+                "publishedAt": parse_published_at(article.get("publishedAt")),
             }
-            daily_articles_collection.insert_one(document)
-            logger.info(f"Stored article: {title}")
+            operations.append(UpdateOne({"title": title}, {"$setOnInsert": document}, upsert=True))
+        if not operations:
+            continue
+
+        try:
+            with trace_span("mongo.bulk_write", collection=daily_articles_collection.name, operations=len(operations)):
+                result = daily_articles_collection.bulk_write(operations, ordered=False)
+            inserted = result.upserted_count
+        except BulkWriteError as e:
+            # Concurrent ingests racing on the same title surface as duplicate key errors
+            inserted = e.details.get("nUpserted", 0)
+            errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+            if errors:
+                logger.error(f"Error storing {len(errors)} articles for topic={topic}: {errors[0].get('errmsg')}")
         except Exception as e:
-            logger.error(f"Error storing article: {e}")
+            logger.error(f"Error storing article batch for topic={topic}: {e}")
+            continue
+
+        batch = {"inserted": inserted, "duplicates": len(operations) - inserted}
+        logger.info(f"Stored article batch for topic={topic}: {batch['inserted']} inserted, {batch['duplicates']} duplicates")
+        batches.append(batch)
+
+    return {
+        "inserted": sum(batch["inserted"] for batch in batches),
+        "duplicates": sum(batch["duplicates"] for batch in batches),
+        "batches": batches,
+    }
 
-def fetch_and_store_articles(date_str, country, topics, page_size):
+def fetch_page(newsapi, topic, from_param, to_param, page, page_size):
+    logger.info(f"Fetching news for topic={topic}, page={page}, from={from_param}")
+    with trace_span("newsapi.everything", topic=topic, page=page):
+        return newsapi.get_everything(
+            q=topic,
+            from_param=from_param,
+            to=to_param,
+            language="en",
+            sort_by="relevancy",
+            page=page,
+            page_size=page_size,
+        )
+
+def fetch_and_store_articles(date_str, country, topics, page_size, max_pages=NEWS_MAX_PAGES, max_workers=NEWS_FETCH_WORKERS):
+    # Page 1 of every topic is requested concurrently; once a topic's totalResults is known its
+    # remaining pages (up to max_pages) are fanned out too. Each page is handed to a single writer
+    # thread as soon as it lands, so Mongo writes overlap the remaining fetches.
     to_param = (datetime.utcnow() - timedelta(days=1)).strftime("%Y-%m-%d")
     from_param = date_str
-    articles_list = []
-    for topic in topics:
-        try:
-            newsapi = get_news_client()
-            logger.info(f"Fetching news for topic={topic}, date={date_str}")
-            response = newsapi.get_everything(
-                q=topic,
-                from_param=from_param,
-                to=to_param,
-                language="en",
-                sort_by="relevancy",
-                page=1,
-                page_size=page_size,
-            )
-            articles = response.get("articles", [])
-            store_articles(date_str, country, topic, articles)
-            articles_list.extend(articles)
-        except Exception as e:
-            logger.error(f"Failed to fetch/store news for topic={topic}, country={country}: {e}")
+    totals = {"inserted": 0, "duplicates": 0, "pages": 0}
+    newsapi = get_news_client()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="newsapi-fetch") as fetch_pool, \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="article-writer") as write_pool:
+        pending = {
+            run_in_context(fetch_pool, fetch_page, newsapi, topic, from_param, to_param, 1, page_size): (topic, 1)
+            for topic in topics
+        }
+        writes = {}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                topic, page = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to fetch news for topic={topic}, page={page}, country={country}: {e}")
+                    continue
+
+                articles = response.get("articles", [])
+                totals["pages"] += 1
+                if articles:
+                    writes[run_in_context(write_pool, store_articles, date_str, country, topic, articles)] = topic
+                if page == 1:
+                    last_page = min(max_pages, math.ceil(response.get("totalResults", 0) / page_size))
+                    for next_page in range(2, last_page + 1):
+                        next_future = run_in_context(fetch_pool, fetch_page, newsapi, topic, from_param, to_param, next_page, page_size)
+                        pending[next_future] = (topic, next_page)
+
+        for future, topic in writes.items():
+            try:
+                stats = future.result()
+                totals["inserted"] += stats["inserted"]
+                totals["duplicates"] += stats["duplicates"]
+            except Exception as e:
+                logger.error(f"Failed to store news for topic={topic}, country={country}: {e}")
+
+    logger.info(f"Fetched {totals['pages']} pages for {len(topics)} topics: {totals['inserted']} inserted, {totals['duplicates']} duplicates")
+    return totals
                 
 def custom_search_articles(params: dict):
     try:
         newsapi = get_news_client()
         logger.info(f"Executing custom search with params: {params}")
-        response = newsapi.get_everything(
-            q=params.get("q"),
-            language=params.get("language", "en"),
-            sort_by="popularity",
-            page_size=15,
-            page=1
-        )
+        with trace_span("newsapi.everything", query=params.get("q")):
+            response = newsapi.get_everything(
+                q=params.get("q"),
+                language=params.get("language", "en"),
+                sort_by="popularity",
+                page_size=15,
+                page=1
+            )
         articles = response.get("articles", [])
 
         exact_matches = []
@@ -87,42 +187,50 @@ def custom_search_articles(params: dict):
 
         for article in articles:
             article['uuid'] = str(uuid.uuid4())
-            title = article.get("title")
-            author = article.get("author")
-            publishedAt = article.get("publishedAt")
-
-            if not title:
-                continue
+        articles = [article for article in articles if article.get("title")]
 
-            exact = daily_articles_collection.find_one({
-                "title": title,
-                "article.author": author,
-                "article.publishedAt": publishedAt
-            })
+        # One indexed $in lookup for the whole page instead of a find_one per article; the $type
+        # predicate matches title_unique's partial filter so the planner can use that index
+        with trace_span("mongo.find", collection=daily_articles_collection.name):
+            stored = list(daily_articles_collection.find(
+                {"title": {"$in": list({article["title"] for article in articles}), "$type": "string"}},
+                {"_id": 0, "title": 1, "article.author": 1, "article.publishedAt": 1}
+            ))
+        stored_keys = {
+            (doc["title"], doc.get("article", {}).get("author"), doc.get("article", {}).get("publishedAt"))
+            for doc in stored
+        }
 
-            if exact:
+        candidates = []
+        for article in articles:
+            if (article["title"], article.get("author"), article.get("publishedAt")) in stored_keys:
                 article["alreadyAdded"] = True
                 exact_matches.append(article)
-                continue
-
-            desc_title = (article.get("title") or "") + " " + (article.get("description") or "")
-            query = params.get("q") or ""
+            else:
+                candidates.append(article)
 
-            tfidf = TfidfVectorizer().fit_transform([query, desc_title])
-            score = cosine_similarity(tfidf[0:1], tfidf[1:2])[0][0] * 100
+        scores = relevance_scores(
+            params.get("q") or "",
+            [(article.get("title") or "") + " " + (article.get("description") or "") for article in candidates]
+        )
 
+        for article, score in zip(candidates, scores):
             if score >= 60:
                 article["match"] = True
-                article["similarity_score"] = score
+                article["similarity_score"] = float(score)
                 similar_matches.append(article)
-                try:
-                    if not daily_articles_collection.find_one({"title": title}):
-                        daily_articles_collection.insert_one({"title": title, "article": article})
-                except Exception as e:
-                    logger.error(f"Failed inserting similar article: {e}")
             else:
                 normal_matches.append(article)
 
+        if similar_matches:
+            try:
+                daily_articles_collection.bulk_write([
+                    UpdateOne({"title": article["title"]}, {"$setOnInsert": {"title": article["title"], "article": article, "publishedAt": parse_published_at(article.get("publishedAt"))}}, upsert=True)
+                    for article in similar_matches
+                ], ordered=False)
+            except Exception as e:
+                logger.error(f"Failed inserting similar articles: {e}")
+
         sorted_articles = exact_matches + similar_matches + normal_matches
         logger.info(f"Custom search: {len(exact_matches)} exact, {len(similar_matches)} similar, {len(normal_matches)} normal")
         return sorted_articles
@@ -131,44 +239,57 @@ def custom_search_articles(params: dict):
         logger.error(f"Custom search failed: {e}")
         raise
     
-async def get_all_articles_util():
+def build_article_query(topic=None, cursor=None):
+    query = {}
+    if topic and topic.lower() != "all":
+        query["topic"] = topic
+    if cursor:
+        query["_id"] = {"$lt": ObjectId(cursor)}
+    return query
+
+def find_articles(topic=None, cursor=None, projection=None):
+    return article_repository.page_by_topic(build_article_query(topic, cursor), projection)
+
+async def get_articles_page(topic=None, cursor=None, limit=ARTICLE_PAGE_SIZE, projection=None):
+    # Keyset pagination on _id (newest first): `next` is the last _id of this page and the
+    # following page starts strictly below it, so deep pages cost the same as the first.
     try:
-        articles = daily_articles_collection.find({}, {"_id" : 0})
-        return list(articles)
+        documents = await find_articles(topic, cursor, projection).limit(limit + 1).to_list(length=limit + 1)
+        next_cursor = str(documents[limit - 1]["_id"]) if len(documents) > limit else None
+        documents = documents[:limit]
+        for document in documents:
+            document.pop("_id", None)
+        return documents, next_cursor
     except Exception as e:
-        logger.error(f"Failed to fetch all articles: {e}")
+        logger.error(f"Failed to fetch articles page: {e}")
         raise
+
+async def stream_articles(topic=None, cursor=None, projection=None):
+    async for document in find_articles(topic, cursor, projection).batch_size(500):
+        document.pop("_id", None)
+        yield document
     
 async def get_todays_news_util():
     try:
-        today = datetime.utcnow().date()
-        cursor = daily_articles_collection.find({}, {"_id": 0})
-        results = []
-        for record in cursor:
-            published_at = record.get("article", {}).get("publishedAt")
-            if published_at:
-                try:
-                    published_date = datetime.strptime(published_at, "%Y-%m-%dT%H:%M:%SZ").date()
-                    if published_date == today:
-                        results.append(record)
-                except ValueError:
-                    continue
-        return results
+        today_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        return await article_repository.published_between(today_start, today_start + timedelta(days=1))
     except Exception as e:
         logger.error(f"Failed to fetch today's news: {e}")
         raise
+
+async def has_recent_articles(topic, days=3):
+    return await article_repository.has_recent(topic, days)
     
 async def fetch_topics(email: str):
     try:
-        user = users_collection.find_one({"email": email}, {"_id": 0, "topics": 1})
+        user = await user_repository.get_by_email(email, {"_id": 0, "topics": 1})
         if not user or "topics" not in user:
             logger.info(f"No topics found for user: {email}")
             return []
 
         user_topics = user["topics"]
 
-        db_topics_cursor = topics_collection.find({}, {"_id": 0, "name": 1})
-        db_topics = set(topic["name"] for topic in db_topics_cursor)
+        db_topics = await topic_repository.existing_names(user_topics)
 
         matched_topics = [topic for topic in user_topics if topic in db_topics]
         return matched_topics
@@ -0,0 +1,89 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayItemStreamer:
+    """Incrementally scans a streamed JSON object and yields the items of one top-level array.
+
+    Feed text chunks as they arrive; every object in the array named `key` is returned by
+    feed() as soon as its closing brace has been seen, without waiting for the rest of the
+    document.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        # Full response, joined only when `text` is read
+        self._chunks = []
+        # Text not yet scanned plus any item or key still being read; positions are absolute
+        self._buffer = ""
+        self._offset = 0
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._array_depth = None
+        self._item_start = None
+        self._finished = False
+
+    @property
+    def text(self):
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def _slice(self, start, end):
+        return self._buffer[start - self._offset:end - self._offset]
+
+    def feed(self, chunk):
+        # Each character is scanned once: the buffer only keeps what a pending item or key needs
+        self._chunks.append(chunk)
+        self._buffer += chunk
+        items = []
+        buffer, offset = self._buffer, self._offset
+        end = offset + len(buffer)
+        while self._pos < end:
+            ch = buffer[self._pos - offset]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = self._slice(self._string_start + 1, self._pos)
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in "{[":
+                if ch == "[" and not self._finished and self._depth == 1 and self._last_key == self.key:
+                    self._array_depth = self._depth + 1
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._item_start = self._pos
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._array_depth is not None:
+                    if ch == "}" and self._depth == self._array_depth and self._item_start is not None:
+                        try:
+                            items.append(json.loads(self._slice(self._item_start, self._pos + 1)))
+                        except json.JSONDecodeError:
+                            logger.warning("Skipping streamed array item that is not valid JSON")
+                        self._item_start = None
+                    elif ch == "]" and self._depth == self._array_depth - 1:
+                        self._array_depth = None
+                        self._finished = True
+            self._pos += 1
+
+        keep = self._pos
+        if self._item_start is not None:
+            keep = min(keep, self._item_start)
+        if self._in_string and self._depth == 1:
+            keep = min(keep, self._string_start)
+        self._buffer = self._buffer[keep - self._offset:]
+        self._offset = keep
+        return items
@@ -0,0 +1,166 @@
+from contextlib import contextmanager
+import bisect
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            state["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            state["sum"] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key, state):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), state["counts"]):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Samples read at scrape time from `collect`, which returns {label values tuple: value}."""
+
+    def __init__(self, name, documentation, labelnames, collect, type_name="gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.type_name = type_name
+
+    def render(self):
+        with self._lock:
+            self._values = dict(self.collect())
+        return super().render()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, labelnames, collect, type_name="gauge"):
+        return self.register(CallbackMetric(name, documentation, labelnames, collect, type_name))
+
+    def render(self):
+        # Prometheus text exposition format 0.0.4
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "Request latency per route.", ("method", "route", "status"))
+fact_analysis_stage_seconds = registry.histogram(
+    "fact_analysis_stage_seconds", "Time spent in each fact analysis stage.", ("stage",))
+fact_analysis_retries = registry.counter(
+    "fact_analysis_retries_total", "Tenacity retries of the LLM calls.", ("call",))
+llm_tokens = registry.counter(
+    "llm_tokens_total", "Tokens reported by the LLM per call.", ("call", "kind"))
+newsapi_request_seconds = registry.histogram(
+    "newsapi_request_duration_seconds", "NewsAPI call latency until response headers.", ("status",))
+claim_index_matches = registry.counter(
+    "claim_index_matches_total", "Prior claim verdicts given to the model.", ("category",))
+upstream_queue_wait_seconds = registry.histogram(
+    "upstream_queue_wait_seconds", "Time a call waited for an upstream rate limit token.", ("upstream",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+upstream_throttled = registry.counter(
+    "upstream_throttled_total", "429 responses received per upstream.", ("upstream",))
+
+
+def register_cache(cache):
+    # Exposes a TTLCache's stats() counters; size is reported separately as a gauge
+    registry.callback(
+        f"{cache.name}_cache_events_total", f"{cache.name} cache events.", ("event",),
+        lambda: {(event,): value for event, value in cache.stats().items() if event != "size"},
+        type_name="counter",
+    )
+    registry.callback(f"{cache.name}_cache_size", f"{cache.name} cache entries.", (), lambda: {(): cache.stats()["size"]})
@@ -0,0 +1,151 @@
+import json
+import logging
+import math
+import re
+
+from llama_index.core.llms import ChatMessage
+
+from config.constants import FACT_CHECK_MAX_INPUT_TOKENS, SOURCE_ANALYSIS_MAX_INPUT_TOKENS
+from models.fact_analysis_model import report_format, source_format
+from prompts.fact_analysis_prompt import FACT_CHECK_SYSTEM_PROMPT, FACT_CHECK_USER_PROMPT
+from prompts.source_ranker import SOURCE_ANALYSIS_SYSTEM_PROMPT, SOURCE_ANALYSIS_USER_PROMPT
+from utils.metrics import llm_tokens
+
+logger = logging.getLogger(__name__)
+
+# Rough English average for the sonar tokenizer; only used to enforce the input budget
+CHARS_PER_TOKEN = 4
+# Bumped whenever the rendering below changes what the model sees (part of ANALYSIS_VERSION)
+PROMPT_FORMAT_VERSION = "3"
+# Sources listed per prior verdict in the fact check prompt
+PRIOR_VERDICT_MAX_SOURCES = 3
+PRIOR_VERDICTS_HEADER = (
+    "Previously verified claims from other coverage of this story. If the article makes the same claim, "
+    "reuse its category and sources; verify anything that differs:"
+)
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact_text(text):
+    # Trailing spaces and runs of blank lines cost tokens without carrying instructions
+    text = "\n".join(line.rstrip() for line in text.strip().splitlines())
+    return re.sub(r"\n{3,}", "\n\n", text)
+
+
+def compact_schema(schema, root=True):
+    # pydantic titles every property and nested model; only the root title is meaningful
+    if isinstance(schema, dict):
+        return {key: compact_schema(value, root=False) for key, value in schema.items() if root or key != "title" or not isinstance(value, str)}
+    if isinstance(schema, list):
+        return [compact_schema(value, root=False) for value in schema]
+    return schema
+
+
+COMPACT_REPORT_FORMAT = compact_schema(report_format)
+COMPACT_SOURCE_FORMAT = compact_schema(source_format)
+FACT_CHECK_SYSTEM = compact_text(FACT_CHECK_SYSTEM_PROMPT)
+SOURCE_ANALYSIS_SYSTEM = compact_text(SOURCE_ANALYSIS_SYSTEM_PROMPT)
+
+
+def _fixed_tokens(system_prompt, user_template, schema):
+    return estimate_tokens(system_prompt) + estimate_tokens(user_template) + estimate_tokens(json.dumps(schema, separators=(",", ":")))
+
+
+def render_prior_verdict(verdict):
+    urls = " ".join(source["url"] for source in verdict.get("sources", [])[:PRIOR_VERDICT_MAX_SOURCES] if source.get("url"))
+    return f"- [{verdict.get('fact_check_category')}] {verdict['claim']} | {urls}".rstrip(" |")
+
+
+def render_prior_verdicts(prior_verdicts, budget):
+    # Best matches first, as many as fit in the tokens the article metadata left over
+    lines = []
+    used = estimate_tokens(PRIOR_VERDICTS_HEADER) + 1
+    for verdict in prior_verdicts or []:
+        line = render_prior_verdict(verdict)
+        if used + estimate_tokens(line) + 1 > budget:
+            break
+        lines.append(line)
+        used += estimate_tokens(line) + 1
+    if not lines:
+        return "", 0
+    return "\n\n" + PRIOR_VERDICTS_HEADER + "\n" + "\n".join(lines), used
+
+
+def build_fact_check_messages(article, metadata_builder, max_input_tokens=FACT_CHECK_MAX_INPUT_TOKENS, prior_verdicts=None):
+    # The description is the only open-ended field; it is cut to whatever the budget leaves.
+    # Prior verdicts from the claim index only get the tokens still free after the metadata.
+    metadata = metadata_builder(article)
+    available = max_input_tokens - _fixed_tokens(FACT_CHECK_SYSTEM, FACT_CHECK_USER_PROMPT, COMPACT_REPORT_FORMAT)
+    overflow = estimate_tokens(metadata) - available
+    description = article.get("description") or ""
+    if overflow > 0 and description:
+        keep = max(0, len(description) - overflow * CHARS_PER_TOKEN)
+        logger.warning(f"Fact check prompt over budget by ~{overflow} tokens, truncating description to {keep} chars")
+        metadata = metadata_builder({**article, "description": description[:keep]})
+
+    prior, prior_tokens = render_prior_verdicts(prior_verdicts, available - estimate_tokens(metadata))
+    user_prompt = FACT_CHECK_USER_PROMPT.format(article_metadata=metadata).strip() + prior
+    messages = [
+        ChatMessage(role="system", content=FACT_CHECK_SYSTEM),
+        ChatMessage(role="user", content=user_prompt),
+    ]
+    return messages, max_input_tokens - available + estimate_tokens(metadata) + prior_tokens
+
+
+def render_sources(sources):
+    # One "id type url" line per source instead of str() of a list of dicts
+    return "\n" + "\n".join(f"{source['id']} {source['type']} {source['source']}" for source in sources)
+
+
+def build_source_messages(sources, max_input_tokens=SOURCE_ANALYSIS_MAX_INPUT_TOKENS):
+    # The target article is always kept; verification sources beyond the budget are dropped
+    # (they simply get no verification in this report).
+    available = max_input_tokens - _fixed_tokens(SOURCE_ANALYSIS_SYSTEM, SOURCE_ANALYSIS_USER_PROMPT, COMPACT_SOURCE_FORMAT)
+    targets = [source for source in sources if source["type"] == "target"]
+    used = estimate_tokens(render_sources(targets))
+    kept = []
+    for source in sources:
+        if source["type"] == "target":
+            continue
+        cost = estimate_tokens(render_sources([source]))
+        if used + cost > available:
+            break
+        kept.append(source)
+        used += cost
+    if len(kept) + len(targets) < len(sources):
+        logger.warning(f"Source prompt over budget, sending {len(kept)} of {len(sources) - len(targets)} verification sources")
+
+    selected = kept + targets
+    user_prompt = SOURCE_ANALYSIS_USER_PROMPT.format(sources=render_sources(selected)).strip()
+    messages = [
+        ChatMessage(role="system", content=SOURCE_ANALYSIS_SYSTEM),
+        ChatMessage(role="user", content=user_prompt),
+    ]
+    return messages, max_input_tokens - available + used, selected
+
+
+def record_usage(usage, call, raw, estimated_input_tokens):
+    # usage is the per-report accumulator stored on the report; counters aggregate across reports
+    reported = (raw or {}).get("usage") or {}
+    entry = {
+        "estimated_input_tokens": estimated_input_tokens,
+        "prompt_tokens": reported.get("prompt_tokens"),
+        "completion_tokens": reported.get("completion_tokens"),
+    }
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if entry[kind]:
+            llm_tokens.inc(entry[kind], call=call, kind=kind)
+    if usage is not None:
+        usage[call] = entry
+    return entry
+
+
+def summarize_usage(usage):
+    total = {"prompt_tokens": 0, "completion_tokens": 0}
+    for entry in usage.values():
+        for kind in total:
+            total[kind] += entry.get(kind) or 0
+    return {**usage, "total": total}
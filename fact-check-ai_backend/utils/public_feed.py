@@ -0,0 +1,84 @@
+from datetime import datetime
+import base64
+import json
+import logging
+
+from config.constants import PUBLIC_FEED_PAGE_SIZE
+from utils.repository import public_feed_repository, report_repository
+
+logger = logging.getLogger(__name__)
+
+FEED_ARTICLE_FIELDS = ("title", "description", "url", "urlToImage", "source", "author", "publishedAt")
+
+# Only what a feed card renders: no source reports, related questions or claim evidence
+FEED_REPORT_PROJECTION = {
+    "_id": 0,
+    "title": 1,
+    "images": 1,
+    "fact_check_report.overall_category": 1,
+    "fact_check_report.category": 1,
+    "fact_check_report.notes": 1,
+    "fact_check_report.claims.claim": 1,
+    "fact_check_report.claims.fact_check_category": 1,
+}
+
+
+def build_feed_entry(article_doc, report, report_id, user_email, published_at):
+    article = article_doc.get("article") or {}
+    return {
+        "report_id": report_id,
+        "article_id": article_doc.get("article_id"),
+        "article": {field: article.get(field) for field in FEED_ARTICLE_FIELDS},
+        "user_email": user_email,
+        "settings": "public",
+        "title": report.get("title"),
+        "fact_check_report": report.get("fact_check_report"),
+        "images": report.get("images") or [],
+        "published_at": published_at,
+    }
+
+
+# A shared report_id can be published by several users; each user's entry is its own feed item
+async def publish_report(article_doc, report_id, user_email, published_at=None):
+    report = await report_repository.get_by_report_id(report_id, FEED_REPORT_PROJECTION)
+    if not report:
+        logger.warning(f"Cannot publish report {report_id}: report not found")
+        return False
+    entry = build_feed_entry(article_doc, report, report_id, user_email, published_at or datetime.utcnow())
+    await public_feed_repository.update_one({"report_id": report_id, "user_email": user_email}, {"$set": entry}, upsert=True)
+    logger.info(f"Report {report_id} added to the public feed for {user_email}")
+    return True
+
+
+async def unpublish_report(report_id, user_email):
+    result = await public_feed_repository.delete_one({"report_id": report_id, "user_email": user_email})
+    if result.deleted_count:
+        logger.info(f"Report {report_id} removed from the public feed for {user_email}")
+
+
+def encode_feed_cursor(entry):
+    token = json.dumps({"t": entry["published_at"].isoformat(), "id": entry["report_id"], "u": entry["user_email"]})
+    return base64.urlsafe_b64encode(token.encode()).decode()
+
+
+def decode_feed_cursor(cursor):
+    token = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(token["t"]), token["id"], token["u"]
+
+
+async def get_public_feed_page(cursor=None, limit=PUBLIC_FEED_PAGE_SIZE):
+    # Keyset pagination on (published_at, report_id, user_email), all descending: the same
+    # report can be published by several users, so user_email breaks the remaining ties
+    query = {}
+    if cursor:
+        published_at, report_id, user_email = decode_feed_cursor(cursor)
+        query = {"$or": [
+            {"published_at": {"$lt": published_at}},
+            {"published_at": published_at, "report_id": {"$lt": report_id}},
+            {"published_at": published_at, "report_id": report_id, "user_email": {"$lt": user_email}},
+        ]}
+    entries = await public_feed_repository.find_many(
+        query, {"_id": 0}, sort=[("published_at", -1), ("report_id", -1), ("user_email", -1)], limit=limit + 1
+    )
+    next_cursor = encode_feed_cursor(entries[limit - 1]) if len(entries) > limit else None
+    return entries[:limit], next_cursor
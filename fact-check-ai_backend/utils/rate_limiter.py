@@ -0,0 +1,283 @@
+"""Adaptive (AIMD) token-bucket rate limiting for upstream APIs.
+
+Every call first takes a token from its upstream's bucket. Buckets live in the
+rate_limits collection by default (RATE_LIMIT_STORE=mongo), so all workers share one
+budget: tokens refill at the bucket's current rate, measured on the database clock.
+Successful calls raise that rate additively up to max_rate; a 429 cuts it
+multiplicatively (once per overload) and blocks the bucket until Retry-After has passed,
+so throughput settles just under the provider's real limit. RATE_LIMIT_STORE=local keeps the
+buckets in process.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+import asyncio
+import random
+import time
+import logging
+
+from requests.adapters import HTTPAdapter
+from pymongo import ReturnDocument
+
+from config.constants import (
+    RATE_LIMIT_STORE, RETRY_BACKOFF_BASE_SECONDS, RETRY_BACKOFF_MAX_SECONDS,
+    PPLX_RATE_LIMIT, NEWSAPI_RATE_LIMIT,
+)
+from config.db import rate_limit_collection
+from utils.repository import rate_limit_repository
+from utils.metrics import upstream_queue_wait_seconds, upstream_throttled, registry
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = (429,)
+RETRYABLE_STATUSES = (429, 502, 503, 504)
+
+
+def parse_retry_after(value):
+    # Retry-After is either delta-seconds or an HTTP date
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def upstream_status(error):
+    # (status, retry_after) from an HTTP client exception or anything it wraps
+    while error is not None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None) or getattr(error, "status_code", None)
+        if status:
+            headers = getattr(response, "headers", None) or {}
+            return status, parse_retry_after(headers.get("retry-after") or headers.get("Retry-After"))
+        error = error.__cause__ or error.__context__
+    return None, None
+
+
+def backoff_delay(attempt):
+    # Full jitter: uniform over [0, base * 2^(attempt - 1)], capped
+    return random.uniform(0, min(RETRY_BACKOFF_MAX_SECONDS, RETRY_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+def upstream_wait(retry_state):
+    """tenacity wait: the upstream's Retry-After when it sent one, jittered exponential backoff otherwise."""
+    _, retry_after = upstream_status(retry_state.outcome.exception())
+    if retry_after is not None:
+        return min(retry_after, RETRY_BACKOFF_MAX_SECONDS)
+    return backoff_delay(retry_state.attempt_number)
+
+
+class MongoBucketStore:
+    """Buckets as documents updated atomically with pipeline updates on the server clock."""
+
+    def _acquire_update(self, limiter):
+        now = "$$NOW"
+        rate = {"$ifNull": ["$rate", limiter.initial_rate]}
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        return [
+            {"$set": {
+                "rate": rate,
+                "tokens": {"$min": [limiter.burst, {"$add": [{"$ifNull": ["$tokens", limiter.burst]}, {"$multiply": [elapsed, rate]}]}]},
+                "blocked": {"$gt": [{"$ifNull": ["$blocked_until", now]}, now]},
+            }},
+            {"$set": {"granted": {"$and": [{"$not": ["$blocked"]}, {"$gte": ["$tokens", 1]}]}, "updated_at": now}},
+            {"$set": {"tokens": {"$cond": ["$granted", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+        ]
+
+    def _record_update(self, limiter, throttled, retry_after):
+        rate = {"$ifNull": ["$rate", limiter.initial_rate]}
+        if not throttled:
+            return [{"$set": {"rate": {"$min": [limiter.max_rate, {"$add": [rate, {"$divide": [limiter.increase, rate]}]}]}}}]
+        # 429s arriving while the bucket is already blocked belong to the same overload: cut once
+        already_blocked = {"$gt": [{"$ifNull": ["$blocked_until", "$$NOW"]}, "$$NOW"]}
+        return [{"$set": {
+            "rate": {"$cond": [already_blocked, rate, {"$max": [limiter.min_rate, {"$multiply": [rate, limiter.decrease]}]}]},
+            "tokens": 0,
+            "blocked_until": {"$max": [
+                {"$ifNull": ["$blocked_until", "$$NOW"]},
+                {"$add": ["$$NOW", int((retry_after or limiter.cooldown) * 1000)]},
+            ]},
+        }}]
+
+    @staticmethod
+    def _result(document):
+        if document["granted"]:
+            return True, 0.0, document["rate"]
+        wait = (1 - document["tokens"]) / document["rate"]
+        if document["blocked"]:
+            wait = max(wait, (document["blocked_until"] - document["updated_at"]).total_seconds())
+        return False, max(wait, 0.001), document["rate"]
+
+    def acquire(self, limiter):
+        document = rate_limit_collection.find_one_and_update(
+            {"_id": limiter.name}, self._acquire_update(limiter), upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return self._result(document)
+
+    async def aacquire(self, limiter):
+        document = await rate_limit_repository.find_one_and_update(
+            {"_id": limiter.name}, self._acquire_update(limiter), upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return self._result(document)
+
+    def record(self, limiter, throttled, retry_after=None):
+        rate_limit_collection.update_one({"_id": limiter.name}, self._record_update(limiter, throttled, retry_after), upsert=True)
+
+    async def arecord(self, limiter, throttled, retry_after=None):
+        await rate_limit_repository.update_one({"_id": limiter.name}, self._record_update(limiter, throttled, retry_after), upsert=True)
+
+
+class LocalBucketStore:
+    """Same bucket semantics kept in this process only."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = Lock()
+
+    def _bucket(self, limiter):
+        return self._buckets.setdefault(limiter.name, {
+            "rate": limiter.initial_rate, "tokens": float(limiter.burst), "updated_at": time.monotonic(), "blocked_until": 0.0,
+        })
+
+    def acquire(self, limiter):
+        with self._lock:
+            bucket = self._bucket(limiter)
+            now = time.monotonic()
+            bucket["tokens"] = min(limiter.burst, bucket["tokens"] + (now - bucket["updated_at"]) * bucket["rate"])
+            bucket["updated_at"] = now
+            if bucket["blocked_until"] > now:
+                return False, max(bucket["blocked_until"] - now, (1 - bucket["tokens"]) / bucket["rate"]), bucket["rate"]
+            if bucket["tokens"] >= 1:
+                bucket["tokens"] -= 1
+                return True, 0.0, bucket["rate"]
+            return False, (1 - bucket["tokens"]) / bucket["rate"], bucket["rate"]
+
+    async def aacquire(self, limiter):
+        return self.acquire(limiter)
+
+    def record(self, limiter, throttled, retry_after=None):
+        with self._lock:
+            bucket = self._bucket(limiter)
+            now = time.monotonic()
+            if throttled:
+                if bucket["blocked_until"] <= now:
+                    bucket["rate"] = max(limiter.min_rate, bucket["rate"] * limiter.decrease)
+                bucket["tokens"] = 0.0
+                bucket["blocked_until"] = max(bucket["blocked_until"], now + (retry_after or limiter.cooldown))
+            else:
+                bucket["rate"] = min(limiter.max_rate, bucket["rate"] + limiter.increase / bucket["rate"])
+
+    async def arecord(self, limiter, throttled, retry_after=None):
+        self.record(limiter, throttled, retry_after)
+
+
+class RateLimiter:
+    def __init__(self, name, initial_rate, max_rate, min_rate=0.1, burst=None, increase=1.0, decrease=0.5, cooldown=1.0, store=None):
+        self.name = name
+        self.initial_rate = float(initial_rate)
+        self.max_rate = float(max_rate)
+        self.min_rate = float(min_rate)
+        self.burst = burst or max(1, int(initial_rate))
+        # Each success adds increase / rate, i.e. about `increase` req/s per second of clean traffic
+        self.increase = increase
+        self.decrease = decrease
+        # Pause after a 429 without Retry-After
+        self.cooldown = cooldown
+        self.store = store or get_store()
+        self.current_rate = self.initial_rate
+
+    def _granted(self, waited):
+        upstream_queue_wait_seconds.observe(waited, upstream=self.name)
+
+    async def acquire(self):
+        start = time.perf_counter()
+        while True:
+            granted, wait, self.current_rate = await self.store.aacquire(self)
+            if granted:
+                return self._granted(time.perf_counter() - start)
+            # A little jitter keeps waiting workers from re-polling in lockstep
+            await asyncio.sleep(wait * random.uniform(1.0, 1.2))
+
+    def acquire_sync(self):
+        start = time.perf_counter()
+        while True:
+            granted, wait, self.current_rate = self.store.acquire(self)
+            if granted:
+                return self._granted(time.perf_counter() - start)
+            time.sleep(wait * random.uniform(1.0, 1.2))
+
+    def record(self, throttled, retry_after=None):
+        if throttled:
+            upstream_throttled.inc(upstream=self.name)
+            logger.warning(f"{self.name} throttled (Retry-After: {retry_after}), reducing rate from {self.current_rate:.2f}/s")
+        self.store.record(self, throttled, retry_after)
+
+    async def arecord(self, throttled, retry_after=None):
+        if throttled:
+            upstream_throttled.inc(upstream=self.name)
+            logger.warning(f"{self.name} throttled (Retry-After: {retry_after}), reducing rate from {self.current_rate:.2f}/s")
+        await self.store.arecord(self, throttled, retry_after)
+
+    @asynccontextmanager
+    async def slot(self):
+        # One upstream call: wait for a token, then feed the outcome back into the rate
+        await self.acquire()
+        try:
+            yield
+        except Exception as e:
+            status, retry_after = upstream_status(e)
+            if status in THROTTLE_STATUSES:
+                await self.arecord(True, retry_after)
+            raise
+        await self.arecord(False)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """requests adapter taking a token per request and retrying throttled/unavailable responses."""
+
+    def __init__(self, limiter, throttle_retries=3, **kwargs):
+        self.limiter = limiter
+        self.throttle_retries = throttle_retries
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        attempt = 0
+        while True:
+            attempt += 1
+            self.limiter.acquire_sync()
+            response = super().send(request, **kwargs)
+            if response.status_code not in RETRYABLE_STATUSES:
+                self.limiter.record(False)
+                return response
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code in THROTTLE_STATUSES:
+                self.limiter.record(True, retry_after)
+            if attempt > self.throttle_retries:
+                return response
+            response.close()
+            time.sleep(min(retry_after, RETRY_BACKOFF_MAX_SECONDS) if retry_after is not None else backoff_delay(attempt))
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = LocalBucketStore() if RATE_LIMIT_STORE == "local" else MongoBucketStore()
+    return _store
+
+
+perplexity_limiter = RateLimiter("perplexity", **PPLX_RATE_LIMIT)
+newsapi_limiter = RateLimiter("newsapi", **NEWSAPI_RATE_LIMIT)
+
+registry.callback(
+    "upstream_rate_limit", "Current allowed request rate per upstream, as last seen by this worker.", ("upstream",),
+    lambda: {(limiter.name,): limiter.current_rate for limiter in (perplexity_limiter, newsapi_limiter)},
+)
@@ -0,0 +1,49 @@
+import logging
+import math
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+# idf of a term found in only one of two documents under TfidfVectorizer's smoothed idf
+# (ln((1 + n) / (1 + df)) + 1 with n=2, df=1); terms in both documents get idf 1
+_ONE_SIDED_IDF = math.log(3 / 2) + 1
+
+
+def relevance_scores(query, documents):
+    # Same scores as fitting TfidfVectorizer on [query, document] for each document, from one
+    # CountVectorizer pass over the page: with two documents a term's idf only depends on
+    # whether the query and the document share it, so the pairwise weights and L2 norms can be
+    # assembled from the raw counts.
+    if not documents:
+        return np.zeros(0)
+    try:
+        counts = CountVectorizer().fit_transform([query or ""] + list(documents)).tocsr().astype(np.float64)
+    except ValueError:
+        # Empty vocabulary: neither the query nor any document has a usable term
+        return np.zeros(len(documents))
+    query_counts = counts[0].toarray().ravel()
+    doc_counts = counts[1:]
+    in_query = (query_counts > 0).astype(np.float64)
+    squared = doc_counts.multiply(doc_counts)
+    extra = _ONE_SIDED_IDF ** 2 - 1
+
+    # Only shared terms contribute to the dot product, and they are weighted 1 on both sides
+    dot = doc_counts @ query_counts
+    doc_norm_sq = _ONE_SIDED_IDF ** 2 * np.asarray(squared.sum(axis=1)).ravel() - extra * (squared @ in_query)
+    query_norm_sq = _ONE_SIDED_IDF ** 2 * (query_counts ** 2).sum() - extra * ((doc_counts > 0).astype(np.float64) @ query_counts ** 2)
+    norms = np.sqrt(doc_norm_sq * query_norm_sq)
+    scores = np.divide(dot, norms, out=np.zeros(len(documents)), where=norms > 0)
+    return scores * 100
+
+
+def similarity_matrix(queries, documents):
+    # Cosine similarity (0-1) of every query against every document in one shared TF-IDF space
+    if not queries or not documents:
+        return np.zeros((len(queries), len(documents)))
+    try:
+        matrix = TfidfVectorizer().fit_transform(list(queries) + list(documents))
+    except ValueError:
+        return np.zeros((len(queries), len(documents)))
+    return np.asarray((matrix[:len(queries)] @ matrix[len(queries):].T).todense())
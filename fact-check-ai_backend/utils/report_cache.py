@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+import hashlib
+import json
+import logging
+
+from config.constants import REPORT_CACHE_TTL_HOURS
+from utils.repository import report_repository
+from config.model_configs import MODEL_PROFILES
+from prompts.fact_analysis_prompt import FACT_CHECK_USER_PROMPT
+from prompts.source_ranker import SOURCE_ANALYSIS_USER_PROMPT
+from utils.prompt_builder import PROMPT_FORMAT_VERSION, PRIOR_VERDICTS_HEADER, FACT_CHECK_SYSTEM, SOURCE_ANALYSIS_SYSTEM, COMPACT_REPORT_FORMAT, COMPACT_SOURCE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+
+def _analysis_version():
+    # Any change to the prompts, schemas or model profiles produces a new version and
+    # therefore invalidates every cached report.
+    digest = hashlib.sha256()
+    for part in (
+        PROMPT_FORMAT_VERSION,
+        PRIOR_VERDICTS_HEADER,
+        FACT_CHECK_SYSTEM,
+        FACT_CHECK_USER_PROMPT,
+        SOURCE_ANALYSIS_SYSTEM,
+        SOURCE_ANALYSIS_USER_PROMPT,
+        json.dumps({name: profile.as_dict() for name, profile in MODEL_PROFILES.items()}, sort_keys=True),
+        json.dumps(COMPACT_REPORT_FORMAT, sort_keys=True),
+        json.dumps(COMPACT_SOURCE_FORMAT, sort_keys=True),
+    ):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+ANALYSIS_VERSION = _analysis_version()
+
+
+def get_content_hash(metadata, profile, version=ANALYSIS_VERSION):
+    # Reports are only reused for the same profile: a "fast" report never answers a "thorough" request
+    return hashlib.sha256(f"{version}\0{profile}\0{metadata}".encode()).hexdigest()
+
+
+async def find_cached_report_id(content_hash, ttl_hours=REPORT_CACHE_TTL_HOURS):
+    if ttl_hours <= 0:
+        return None
+    try:
+        cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+        report = await report_repository.find_one(
+            {
+                "content_hash": content_hash,
+                "created_at": {"$gte": cutoff},
+                "fact_check_report": {"$ne": None},
+            },
+            {"report_id": 1, "_id": 0},
+            sort=[("created_at", -1)],
+        )
+        return report["report_id"] if report else None
+    except Exception as e:
+        # A cache lookup failure must never fail the analysis itself
+        logger.exception(f"Report cache lookup failed: {str(e)}")
+        return None
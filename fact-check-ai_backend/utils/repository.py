@@ -0,0 +1,231 @@
+from datetime import datetime, timedelta
+
+from config.constants import REPORT_COLLECTION, TOPIC_COLLATION
+from utils.tracing import trace_span
+from config.db import (
+    async_users_collection,
+    async_daily_articles_collection,
+    async_topics_collection,
+    async_report_collection,
+    async_source_cache_collection,
+    async_public_feed_collection,
+    async_batch_collection,
+    async_rate_limit_collection,
+    async_claim_index_collection,
+)
+
+
+def report_summary_pipeline(email, skip, limit):
+    # One round trip: unwind the user's report entries, page them, and join only the
+    # precomputed summary of each report (written by store_report) instead of the full report.
+    # Paging happens before the join, so entries whose report is missing are kept (and dropped
+    # by report_summaries); that keeps page boundaries stable and tells whether more entries exist.
+    return [
+        {"$match": {"reports": {"$elemMatch": {"analyzed": True, "user_email": email}}}},
+        {"$sort": {"_id": -1}},
+        {"$project": {"_id": 0, "article": "$$ROOT", "report_info": "$reports"}},
+        {"$unset": "article._id"},
+        {"$unwind": "$report_info"},
+        {"$match": {
+            "report_info.analyzed": True,
+            "report_info.user_email": email,
+            "report_info.report_id": {"$type": "string"},
+        }},
+        {"$skip": skip},
+        {"$limit": limit + 1},
+        {"$lookup": {
+            "from": REPORT_COLLECTION,
+            "localField": "report_info.report_id",
+            "foreignField": "report_id",
+            "pipeline": [{"$project": {"_id": 0, "summary": 1}}],
+            "as": "report",
+        }},
+        {"$unwind": {"path": "$report", "preserveNullAndEmptyArrays": True}},
+        {"$project": {
+            "report_found": {"$cond": [{"$ifNull": ["$report", False]}, True, False]},
+            "article": 1,
+            "report_id": "$report_info.report_id",
+            "title": "$report.summary.title",
+            "overall_category": "$report.summary.overall_category",
+            "claim_counts": "$report.summary.claim_counts",
+            "notes": "$report.summary.notes",
+            "category": "$report.summary.category",
+        }},
+    ]
+
+
+class AsyncRepository:
+    """Async (motor) access to one collection, so async endpoints never block the event loop."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def find_one(self, query, projection=None, **kwargs):
+        with trace_span("mongo.find_one", collection=self.collection.name):
+            return await self.collection.find_one(query, projection, **kwargs)
+
+    def find(self, query=None, projection=None, sort=None, collation=None):
+        # Returns the motor cursor for callers that stream or page with limit/batch_size
+        cursor = self.collection.find(query or {}, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if collation:
+            cursor = cursor.collation(collation)
+        return cursor
+
+    async def find_many(self, query=None, projection=None, sort=None, limit=0, collation=None):
+        cursor = self.find(query, projection, sort=sort, collation=collation)
+        if limit:
+            cursor = cursor.limit(limit)
+        with trace_span("mongo.find", collection=self.collection.name) as span:
+            documents = await cursor.to_list(length=limit or None)
+            span.set(documents=len(documents))
+        return documents
+
+    async def aggregate(self, pipeline, **kwargs):
+        with trace_span("mongo.aggregate", collection=self.collection.name):
+            return await self.collection.aggregate(pipeline, **kwargs).to_list(length=None)
+
+    async def insert_one(self, document):
+        with trace_span("mongo.insert_one", collection=self.collection.name):
+            return await self.collection.insert_one(document)
+
+    async def update_one(self, query, update, upsert=False):
+        with trace_span("mongo.update_one", collection=self.collection.name):
+            return await self.collection.update_one(query, update, upsert=upsert)
+
+    async def update_many(self, query, update):
+        with trace_span("mongo.update_many", collection=self.collection.name):
+            return await self.collection.update_many(query, update)
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        with trace_span("mongo.find_one_and_update", collection=self.collection.name):
+            return await self.collection.find_one_and_update(query, update, **kwargs)
+
+    async def delete_one(self, query):
+        with trace_span("mongo.delete_one", collection=self.collection.name):
+            return await self.collection.delete_one(query)
+
+    async def delete_many(self, query):
+        with trace_span("mongo.delete_many", collection=self.collection.name):
+            return await self.collection.delete_many(query)
+
+    async def bulk_write(self, operations, ordered=False):
+        with trace_span("mongo.bulk_write", collection=self.collection.name):
+            return await self.collection.bulk_write(operations, ordered=ordered)
+
+
+class ArticleRepository(AsyncRepository):
+
+    async def get_by_article_id(self, article_id, projection=None):
+        return await self.find_one({"article_id": article_id}, projection)
+
+    async def push_report(self, article_id, report_id, email):
+        # Shared (coalesced or cached) reports get one entry per user; repeat requests add nothing
+        return await self.update_one(
+            {"article_id": article_id, "reports": {"$not": {"$elemMatch": {"report_id": report_id, "user_email": email}}}},
+            {"$push": {"reports": {"report_id": report_id, "analyzed": True, "user_email": email}}}
+        )
+
+    async def set_report_settings(self, article_id, report_id, email, settings):
+        # The same report_id can belong to several users; only the caller's entry is updated
+        result = await self.update_one(
+            {"article_id": article_id, "reports": {"$elemMatch": {"report_id": report_id, "user_email": email}}},
+            {"$set": {"reports.$.settings": settings}}
+        )
+        return result.matched_count
+
+    async def has_recent(self, topic, days):
+        threshold = datetime.utcnow() - timedelta(days=days)
+        return await self.find_one({"topic": topic, "publishedAt": {"$gte": threshold}}, {"_id": 1}) is not None
+
+    async def published_between(self, start, end):
+        return await self.find_many({"publishedAt": {"$gte": start, "$lt": end}}, {"_id": 0})
+
+    def page_by_topic(self, query, projection=None):
+        # Newest first on _id; topic matches use the case-insensitive collation of the topic index
+        return self.find(query, projection, sort=[("_id", -1)], collation=TOPIC_COLLATION if "topic" in query else None)
+
+    async def report_summaries(self, email, skip, limit):
+        # Returns (summaries, has_more); a page can hold fewer than `limit` summaries when some
+        # saved entries point at a report that no longer exists
+        entries = await self.aggregate(report_summary_pipeline(email, skip, limit))
+        summaries = [entry for entry in entries[:limit] if entry.pop("report_found")]
+        return summaries, len(entries) > limit
+
+
+    async def ids_for_topic_and_day(self, topic, day_start, day_end, exclude_email=None):
+        query = {"topic": topic, "publishedAt": {"$gte": day_start, "$lt": day_end}}
+        if exclude_email:
+            query["reports.user_email"] = {"$ne": exclude_email}
+        documents = await self.find_many(query, {"_id": 0, "article_id": 1}, collation=TOPIC_COLLATION)
+        return [document["article_id"] for document in documents if document.get("article_id")]
+
+
+class ReportRepository(AsyncRepository):
+
+    async def get_by_report_id(self, report_id, projection=None):
+        return await self.find_one({"report_id": report_id}, projection or {"_id": 0})
+
+
+class UserRepository(AsyncRepository):
+
+    async def get_by_email(self, email, projection=None):
+        return await self.find_one({"email": email}, projection)
+
+    async def set_fields(self, email, fields):
+        return await self.update_one({"email": email}, {"$set": fields})
+
+
+class BatchRepository(AsyncRepository):
+
+    async def get_by_batch_id(self, batch_id):
+        return await self.find_one({"batch_id": batch_id}, {"_id": 0})
+
+    async def set_item(self, batch_id, index, fields, counter=None):
+        # Items are addressed by position; counters are incremented in the same write
+        update = {"$set": {f"items.{index}.{key}": value for key, value in fields.items()}}
+        if counter:
+            update["$inc"] = {f"counts.{counter}": 1}
+        return await self.update_one({"batch_id": batch_id}, update)
+
+    async def set_fields(self, batch_id, fields):
+        return await self.update_one({"batch_id": batch_id}, {"$set": fields})
+
+    async def interrupt_stale(self, cutoff, batch_id=None):
+        # Running batches whose worker stopped sending heartbeats: their unfinished items are
+        # marked interrupted and counted as failed, in one pipeline update per batch
+        query = {"status": "running", "$or": [
+            {"heartbeat_at": {"$lt": cutoff}},
+            {"heartbeat_at": {"$exists": False}, "created_at": {"$lt": cutoff}},
+        ]}
+        if batch_id:
+            query["batch_id"] = batch_id
+        unfinished = {"$in": ["$$item.status", ["pending", "running"]]}
+        result = await self.update_many(query, [{"$set": {
+            "status": "interrupted",
+            "finished_at": "$$NOW",
+            "counts.failed": {"$add": ["$counts.failed", {"$size": {"$filter": {"input": "$items", "as": "item", "cond": unfinished}}}]},
+            "items": {"$map": {"input": "$items", "as": "item", "in": {"$cond": [
+                unfinished, {"$mergeObjects": ["$$item", {"status": "interrupted", "finished_at": "$$NOW"}]}, "$$item",
+            ]}}},
+        }}])
+        return result.modified_count
+
+
+class TopicRepository(AsyncRepository):
+
+    async def existing_names(self, names):
+        documents = await self.find_many({"name": {"$in": list(names)}}, {"_id": 0, "name": 1})
+        return {document["name"] for document in documents}
+
+
+user_repository = UserRepository(async_users_collection)
+article_repository = ArticleRepository(async_daily_articles_collection)
+topic_repository = TopicRepository(async_topics_collection)
+report_repository = ReportRepository(async_report_collection)
+source_cache_repository = AsyncRepository(async_source_cache_collection)
+public_feed_repository = AsyncRepository(async_public_feed_collection)
+batch_repository = BatchRepository(async_batch_collection)
+rate_limit_repository = AsyncRepository(async_rate_limit_collection)
+claim_index_repository = AsyncRepository(async_claim_index_collection)
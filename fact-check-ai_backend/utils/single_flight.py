@@ -0,0 +1,35 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into a single execution.
+
+    The first caller for a key (the leader) schedules the work as a task; callers that
+    arrive while it is in flight await the same task and receive the same result or
+    exception. The work is shielded, so a cancelled caller does not cancel it for the rest.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    def in_flight(self, key):
+        return key in self._inflight
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def do(self, key, func, *args, **kwargs):
+        task = self._inflight.get(key)
+        shared = task is not None
+        if not shared:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            logger.info(f"Joining in-flight call for key: {key}")
+        result = await asyncio.shield(task)
+        return result, shared
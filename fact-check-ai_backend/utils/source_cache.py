@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import logging
+
+from pymongo import UpdateOne
+
+from config.constants import SOURCE_CACHE_TTL_DAYS
+from utils.repository import source_cache_repository
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ocid", "cmpid"}
+
+
+def normalize_url(url):
+    try:
+        parts = urlsplit(url.strip())
+        host = parts.netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        path = parts.path.rstrip("/") or "/"
+        query = urlencode(sorted(
+            (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+        ))
+        return urlunsplit(("https", host, path, query, ""))
+    except Exception:
+        return url.strip()
+
+
+async def get_cached_verifications(urls, ttl_days=SOURCE_CACHE_TTL_DAYS):
+    if ttl_days <= 0 or not urls:
+        return {}
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=ttl_days)
+        documents = await source_cache_repository.find_many(
+            {"url": {"$in": list({normalize_url(url) for url in urls})}, "verified_at": {"$gte": cutoff}},
+            {"_id": 0, "url": 1, "verification": 1},
+        )
+        return {doc["url"]: doc["verification"] for doc in documents}
+    except Exception as e:
+        logger.exception(f"Source cache lookup failed: {str(e)}")
+        return {}
+
+
+async def store_verifications(verifications):
+    # {normalized source URL sent to the model: verification}
+    operations = []
+    now = datetime.utcnow()
+    for url, verification in verifications.items():
+        # id and type are positional within a single report, so they are not cached
+        entry = {key: value for key, value in verification.items() if key not in ("id", "type")}
+        operations.append(UpdateOne(
+            {"url": url},
+            {"$set": {"url": url, "verification": entry, "verified_at": now}},
+            upsert=True,
+        ))
+    if not operations:
+        return
+    try:
+        await source_cache_repository.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.exception(f"Failed to store source verifications: {str(e)}")
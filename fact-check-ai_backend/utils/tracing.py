@@ -0,0 +1,173 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from datetime import datetime, timezone
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+
+from config.constants import TRACE_SAMPLE_RATE, TRACE_EXPORTER, TRACE_FILE
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+_request_id = ContextVar("request_id", default=None)
+_current_span = ContextVar("current_span", default=None)
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans", "lock")
+
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self.spans = []
+        self.lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "started_at", "_start", "duration_ms", "error")
+
+    def __init__(self, trace, name, parent_id, attributes):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+        with self.trace.lock:
+            self.trace.spans.append(self)
+
+    def to_dict(self):
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_export_lock = threading.Lock()
+
+
+def export_trace(trace):
+    if TRACE_EXPORTER == "none":
+        return
+    record = json.dumps({"trace_id": trace.trace_id, "spans": [span.to_dict() for span in trace.spans]}, default=str)
+    if TRACE_EXPORTER == "file":
+        try:
+            with _export_lock, open(TRACE_FILE, "a") as trace_file:
+                trace_file.write(record + "\n")
+        except OSError as e:
+            logger.error(f"Failed to export trace {trace.trace_id}: {e}")
+    else:
+        logger.info(f"trace {record}")
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+@contextmanager
+def trace_span(name, **attributes):
+    # Nested under the current span of this request; a no-op when the request is not sampled
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    span = Span(parent.trace, name, parent.span_id, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Async generators can be resumed in a copied context
+            _current_span.set(parent)
+        span.finish()
+
+
+def run_in_context(pool, func, *args, **kwargs):
+    # ThreadPoolExecutor.submit that keeps the caller's request id and current span
+    return pool.submit(copy_context().run, func, *args, **kwargs)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span of every HTTP request.
+
+    The request id is taken from X-Request-ID (or generated), echoed on the response and
+    available to logs through get_request_id(). Only TRACE_SAMPLE_RATE of requests record
+    spans; a trace is exported once the last body chunk is sent, so streaming responses
+    are covered end to end.
+    """
+
+    def __init__(self, app, sample_rate=None):
+        self.app = app
+        self.sample_rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode() or uuid.uuid4().hex
+        request_token = _request_id.set(request_id)
+        root = None
+        span_token = None
+        if random.random() < self.sample_rate:
+            root = Span(_Trace(request_id), f"{scope['method']} {scope['path']}", None, {"method": scope["method"], "path": scope["path"]})
+            span_token = _current_span.set(root)
+
+        def finish_root():
+            route = scope.get("route")
+            root.set(route=getattr(route, "path", None))
+            root.finish()
+            export_trace(root.trace)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(REQUEST_ID_HEADER.encode(), request_id.encode())]
+                if root is not None:
+                    root.set(status=message["status"])
+            await send(message)
+            if root is not None and root.duration_ms is None and message["type"] == "http.response.body" and not message.get("more_body"):
+                finish_root()
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except BaseException as e:
+            if root is not None:
+                root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            # Errors and disconnects never send a final body chunk
+            if root is not None and root.duration_ms is None:
+                finish_root()
+            if span_token is not None:
+                _current_span.reset(span_token)
+            _request_id.reset(request_token)
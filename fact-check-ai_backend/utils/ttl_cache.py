@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "refresh_at", "refreshing")
+
+    def __init__(self, value, ttl, refresh_ratio):
+        now = time.monotonic()
+        self.value = value
+        self.expires_at = now + ttl
+        self.refresh_at = now + ttl * refresh_ratio
+        self.refreshing = False
+
+
+class _Negative:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-key TTL.
+
+    - Misses are single-flight: concurrent callers for the same key wait for one loader call.
+    - Once an entry is past refresh_ratio of its TTL, the next hit returns the cached value
+      and reloads it on a background thread, so hot keys never expire on the request path.
+    - Loader exceptions listed in negative_exceptions are cached for negative_ttl and re-raised
+      on hits, so lookups of missing keys do not hammer the backend either.
+    - ttl may be a callable taking the loaded value, for entries whose freshness depends on it.
+    - hits/misses/loads/refreshes/errors counters are exposed through stats().
+    """
+
+    def __init__(self, name, default_ttl, refresh_ratio=0.8, negative_ttl=0, negative_exceptions=()):
+        self.name = name
+        self.default_ttl = default_ttl
+        self.refresh_ratio = refresh_ratio
+        self.negative_ttl = negative_ttl
+        self.negative_exceptions = tuple(negative_exceptions)
+        self._entries = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "loads": 0, "refreshes": 0, "errors": 0}
+
+    def _count(self, counter):
+        self._counters[counter] += 1
+
+    def peek(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() < entry.expires_at and not isinstance(entry.value, _Negative):
+                return True, entry.value
+        return False, None
+
+    def _resolve_ttl(self, value, ttl):
+        if callable(ttl):
+            ttl = ttl(value)
+        # 0 is a valid TTL (cache nothing); only a missing TTL falls back to the default
+        return self.default_ttl if ttl is None else ttl
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = _Entry(value, self._resolve_ttl(value, ttl), self.refresh_ratio)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        logger.info(f"{self.name} cache invalidated: {key if key is not None else 'all keys'}")
+
+    def get(self, key, loader, ttl=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry and now < entry.expires_at:
+                self._count("hits")
+                if isinstance(entry.value, _Negative):
+                    raise entry.value.error
+                if now >= entry.refresh_at and not entry.refreshing:
+                    entry.refreshing = True
+                    threading.Thread(target=self._refresh, args=(key, loader, ttl), daemon=True).start()
+                return entry.value
+            self._count("misses")
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._load(key, loader)
+            self.set(key, flight.value, ttl)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            if self.negative_ttl and isinstance(e, self.negative_exceptions):
+                with self._lock:
+                    self._entries[key] = _Entry(_Negative(e), self.negative_ttl, 1.0)
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    def _load(self, key, loader):
+        with self._lock:
+            self._count("loads")
+        try:
+            return loader()
+        except Exception:
+            with self._lock:
+                self._count("errors")
+            raise
+
+    def _refresh(self, key, loader, ttl):
+        try:
+            value = self._load(key, loader)
+            self.set(key, value, ttl)
+            with self._lock:
+                self._count("refreshes")
+        except Exception as e:
+            logger.warning(f"{self.name} cache background refresh failed for {key}: {e}")
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry:
+                    entry.refreshing = False
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "size": len(self._entries)}
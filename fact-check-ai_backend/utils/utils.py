@@ -1,21 +1,27 @@
 import ast
 import json
 import logging
-import os
-from azure.keyvault.secrets import SecretClient
-from azure.identity import DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient
-from io import BytesIO
+from config.secrets import get_secret, download_blob
+from config.constants import LOG_LLM_PAYLOADS, LOG_PAYLOAD_MAX_CHARS
 
 
 logger = logging.getLogger(__name__)
 
+def log_payload(label, payload):
+    # Opt-in (LOG_LLM_PAYLOADS) so the hot path never stringifies large payloads by default
+    if not LOG_LLM_PAYLOADS:
+        return
+    text = payload if isinstance(payload, str) else repr(payload)
+    if len(text) > LOG_PAYLOAD_MAX_CHARS:
+        text = f"{text[:LOG_PAYLOAD_MAX_CHARS]}... [{len(text) - LOG_PAYLOAD_MAX_CHARS} more chars]"
+    logger.info(f"{label}: {text}")
+
 def format_response(response):
     response_json = response['message']['content']
-    logger.info(f"Raw response JSON: {response_json}")
+    log_payload("Raw response JSON", response_json)
     try:
         parsed_response = json.loads(response_json)
-        logger.info("Response parsed as JSON.")
+        logger.debug("Response parsed as JSON.")
         return parsed_response
     except json.JSONDecodeError:
         logger.exception("Failed to parse as JSON, attempting literal eval.")
@@ -29,32 +35,13 @@ def format_response(response):
         
 def get_secret_key(key):
     try:
-        KEYVAULT_URI = 'https://kvfactanalysis.vault.azure.net/'
-        credential = DefaultAzureCredential()
-        client = SecretClient(vault_url=KEYVAULT_URI, credential=credential)
-        retrieved_secret = client.get_secret(key)
+        secret_value = get_secret(key)
         logger.info(f"Successfully retrieved secret for key: {key}")
-        return retrieved_secret.value
+        return secret_value
     except Exception as e:
         logger.exception(f"Error retrieving secret for key {key}: {e}")
         raise
     
 
 def download_pdf(blob_name: str, container_name: str):
-    try:
-        AZURE_STORAGE_ACCOUNT_URL = get_secret_key("SA-ENDPOINT")
-        AZURE_STORAGE_KEY = get_secret_key('SA-KEY')
-        blob_service_client = BlobServiceClient(
-            account_url=AZURE_STORAGE_ACCOUNT_URL, 
-            credential=AZURE_STORAGE_KEY
-        )
-        container_client = blob_service_client.get_container_client(container_name)
-        blob_client = container_client.get_blob_client(blob_name)
-
-        stream = BytesIO()
-        blob_client.download_blob().readinto(stream)
-        stream.seek(0) 
-        return stream
-
-    except Exception as e:
-        raise
\ No newline at end of file
+    return download_blob(container_name, blob_name)
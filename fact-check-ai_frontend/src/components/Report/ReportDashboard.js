@@ -7,6 +7,7 @@ import {
   Avatar,
   useColorScheme,
   Stack,
+  Button,
 } from "@mui/joy";
 import {
   CheckCircle,
@@ -27,6 +28,9 @@ const ArticleDashboard = () => {
   const navigate = useNavigate();
   const { mode } = useColorScheme();
   const [articles, setArticles] = useState([]);
+  const [page, setPage] = useState(1);
+  const [hasMore, setHasMore] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const getClaimIcon = (category) => {
     const size = 14;
@@ -48,11 +52,29 @@ const ArticleDashboard = () => {
       const userMail = localStorage.getItem('email')
       const response = await getReportSummary(userMail);
       setArticles(Array.isArray(response?.articles) ? response.articles : []);
+      setPage(1);
+      setHasMore(!!response?.has_more);
     } catch (error) {
     } finally {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!hasMore || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const userMail = localStorage.getItem('email')
+      const response = await getReportSummary(userMail, page + 1);
+      const fetched = Array.isArray(response?.articles) ? response.articles : [];
+      setArticles((prevArticles) => [...prevArticles, ...fetched]);
+      setPage(page + 1);
+      setHasMore(!!response?.has_more);
+    } catch (error) {
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchReportSummary();
   }, []);
@@ -160,6 +182,19 @@ const ArticleDashboard = () => {
           </Stack>
         </Card>
       ))}
+      {hasMore && (
+        <Box sx={{ display: "flex", justifyContent: "center", mt: 2 }}>
+          <Button
+            size="sm"
+            variant="outlined"
+            color="neutral"
+            loading={loadingMore}
+            onClick={handleLoadMore}
+          >
+            Load More
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 };
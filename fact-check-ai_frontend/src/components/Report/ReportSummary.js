@@ -85,7 +85,7 @@ export const ReportSummary = ({
     try {
       if (isUserReportOwner) {
         const settings = visibility;
-        await updateSettings(settings, articleId, reportId);
+        await updateSettings(settings, articleId, reportId, userEmail);
         setSuccess({
           status: true,
           message: `Settings updated successfully to ${visibility}`,
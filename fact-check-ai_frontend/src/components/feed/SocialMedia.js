@@ -18,14 +18,20 @@ import ChevronRightIcon from '@mui/icons-material/ChevronRight';
 import ChevronLeftIcon from '@mui/icons-material/ChevronLeft';
 
 
+// The same report can be published by several users; each (report, user) pair is one post
+const postKey = (post) => `${post.report_id}:${post.user_email}`;
+
 const SocialMediaFeed = () => {
   const [reports, setReports] = useState([]);
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [expandedNotes, setExpandedNotes] = useState({});
   const { mode } = useColorScheme();
   const carouselRefs = useRef(new Map());
+  const sentinelRef = useRef(null);
 
   const handleGetFeed = async () => {
     try {
@@ -33,6 +39,7 @@ const SocialMediaFeed = () => {
       const response = await getFeed();
       const fetchedReports = Array.isArray(response?.reports) ? response.reports : [];
       setReports(fetchedReports);
+      setNextCursor(response?.next || null);
     } catch (error) {
       setError("Failed to fetch posts");
       console.error("Error fetching feed:", error);
@@ -41,13 +48,44 @@ const SocialMediaFeed = () => {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const response = await getFeed(nextCursor);
+      const fetchedReports = Array.isArray(response?.reports) ? response.reports : [];
+      setReports((prevReports) => [...prevReports, ...fetchedReports]);
+      setNextCursor(response?.next || null);
+    } catch (error) {
+      // Stop auto-loading so a failing page is not requested on every scroll
+      setNextCursor(null);
+      setError("Failed to fetch more posts");
+      console.error("Error fetching feed:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     handleGetFeed();
   }, []);
 
+  // Load the next page once the end of the feed scrolls into view
+  useEffect(() => {
+    const sentinel = sentinelRef.current;
+    if (!sentinel || !nextCursor) return;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) handleLoadMore();
+    });
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [nextCursor, loadingMore]);
+
   useEffect(() => {
-    setPosts(
-      reports
+    setPosts((prevPosts) => {
+      // Keep likes/dislikes given to posts already on screen when a page is appended
+      const previous = new Map(prevPosts.map((post) => [postKey(post), post]));
+      return reports
         .filter(
           (report) =>
             report.article &&
@@ -55,41 +93,44 @@ const SocialMediaFeed = () => {
             report.user_email &&
             report.report_id
         )
-        .map((report) => ({
-          ...report,
-          likes: report.likes || 0,
-          dislikes: report.dislikes || 0,
-        }))
-    );
+        .map((report) => {
+          const shown = previous.get(postKey(report));
+          return {
+            ...report,
+            likes: shown ? shown.likes : report.likes || 0,
+            dislikes: shown ? shown.dislikes : report.dislikes || 0,
+          };
+        });
+    });
   }, [reports]);
 
-  const handleLike = (reportId) => {
+  const handleLike = (key) => {
     setPosts((prevPosts) =>
       prevPosts.map((post) =>
-        post.report_id === reportId ? { ...post, likes: post.likes + 1 } : post
+        postKey(post) === key ? { ...post, likes: post.likes + 1 } : post
       )
     );
   };
 
-  const handleDislike = (reportId) => {
+  const handleDislike = (key) => {
     setPosts((prevPosts) =>
       prevPosts.map((post) =>
-        post.report_id === reportId
+        postKey(post) === key
           ? { ...post, dislikes: post.dislikes + 1 }
           : post
       )
     );
   };
 
-  const toggleNote = (reportId) => {
+  const toggleNote = (key) => {
     setExpandedNotes((prev) => ({
       ...prev,
-      [reportId]: !prev[reportId],
+      [key]: !prev[key],
     }));
   };
 
-  const scrollCarousel = (reportId, direction) => {
-    const carousel = carouselRefs.current.get(reportId);
+  const scrollCarousel = (key, direction) => {
+    const carousel = carouselRefs.current.get(key);
     if (carousel) {
       const scrollAmount = carousel.offsetWidth / 2;
       carousel.scrollBy({
@@ -174,10 +215,11 @@ const SocialMediaFeed = () => {
           ...(post.images ? post.images.map((img) => img.image_url) : []),
         ].filter(Boolean);
         const claimSummary = getClaimSummary(post.fact_check_report?.claims);
+        const key = postKey(post);
 
         return (
           <Card
-            key={post.report_id}
+            key={key}
             sx={{
               mb: 3,
               borderRadius: "lg",
@@ -233,7 +275,7 @@ const SocialMediaFeed = () => {
               {images.length > 0 ? (
                 <Box sx={{ position: "relative" }}>
                   <Box
-                    ref={(el) => carouselRefs.current.set(post.report_id, el)}
+                    ref={(el) => carouselRefs.current.set(key, el)}
                     sx={{
                       display: "flex",
                       overflowX: "auto",
@@ -270,7 +312,7 @@ const SocialMediaFeed = () => {
                     size="sm"
                     variant="solid"
                     color="neutral"
-                    onClick={() => scrollCarousel(post.report_id, "left")}
+                    onClick={() => scrollCarousel(key, "left")}
                     sx={{
                       position: "absolute",
                       left: 8,
@@ -288,7 +330,7 @@ const SocialMediaFeed = () => {
                     size="sm"
                     variant="solid"
                     color="neutral"
-                    onClick={() => scrollCarousel(post.report_id, "right")}
+                    onClick={() => scrollCarousel(key, "right")}
                     sx={{
                       position: "absolute",
                       right: 8,
@@ -388,30 +430,30 @@ const SocialMediaFeed = () => {
                   color: mode === "dark" ? "neutral.400" : "neutral.600",
                   mb: 1,
                   display: "-webkit-box",
-                  WebkitLineClamp: expandedNotes[post.report_id] ? "unset" : 1,
+                  WebkitLineClamp: expandedNotes[key] ? "unset" : 1,
                   WebkitBoxOrient: "vertical",
                   overflow: "hidden",
                 }}
               >
                 {post.fact_check_report?.notes || "No notes available"}
-                {!expandedNotes[post.report_id] &&
+                {!expandedNotes[key] &&
                   post.fact_check_report?.notes && (
                     <Button
                       variant="plain"
                       color="primary"
                       size="sm"
-                      onClick={() => toggleNote(post.report_id)}
+                      onClick={() => toggleNote(key)}
                       sx={{ ml: 1, fontWeight: "md" }}
                     >
                       Read More
                     </Button>
                   )}
-                {expandedNotes[post.report_id] && (
+                {expandedNotes[key] && (
                   <Button
                     variant="plain"
                     color="primary"
                     size="sm"
-                    onClick={() => toggleNote(post.report_id)}
+                    onClick={() => toggleNote(key)}
                     sx={{ ml: 1, fontWeight: "md" }}
                   >
                     Show Less
@@ -454,7 +496,7 @@ const SocialMediaFeed = () => {
                     size="sm"
                     variant="plain"
                     color="neutral"
-                    onClick={() => handleLike(post.report_id)}
+                    onClick={() => handleLike(key)}
                     sx={{
                       "&:hover": {
                         bgcolor: mode === "dark" ? "neutral.700" : "neutral.100",
@@ -477,7 +519,7 @@ const SocialMediaFeed = () => {
                     size="sm"
                     variant="plain"
                     color="neutral"
-                    onClick={() => handleDislike(post.report_id)}
+                    onClick={() => handleDislike(key)}
                     sx={{
                       "&:hover": {
                         bgcolor: mode === "dark" ? "neutral.700" : "neutral.100",
@@ -500,6 +542,12 @@ const SocialMediaFeed = () => {
           </Card>
         );
       })}
+      <Box ref={sentinelRef} sx={{ height: 1 }} />
+      {loadingMore && (
+        <Box sx={{ display: "flex", justifyContent: "center", py: 2 }}>
+          <CircularProgress size="sm" />
+        </Box>
+      )}
     </Box>
   );
 };
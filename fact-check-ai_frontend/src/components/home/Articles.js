@@ -43,6 +43,8 @@ const Articles = ({ selectedTopic, sortOrder, query }) => {
   const theme = useTheme();
   const [articles, setArticles] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [dateRange, setDateRange] = useState("1");
   const [pageSize, setPageSize] = useState("10");
   const [pageSizeError, setPageSizeError] = useState(null);
@@ -81,36 +83,55 @@ const Articles = ({ selectedTopic, sortOrder, query }) => {
     }
   };
 
+  const arrangeArticles = (fetchedArticles) => {
+    // Sort articles based on sortOrder
+    let arranged = [...fetchedArticles].sort((a, b) => {
+      const dateA = new Date(a.publishedAt);
+      const dateB = new Date(b.publishedAt);
+      return sortOrder === "latest" ? dateB - dateA : dateA - dateB;
+    });
+
+    // Filter articles by query if not empty
+    if (query && query.trim() !== "") {
+      const queryLower = query.toLowerCase();
+      arranged = arranged.filter((article) =>
+        article.title?.toLowerCase().includes(queryLower)
+      );
+    }
+    return arranged;
+  };
+
   const handleFetchArticles = async () => {
     setLoading(true);
     try {
-      const response = await fetchArticles(selectedTopic, dateRange);
-      let fetchedArticles = response?.articles || [];
-
-      // Sort articles based on sortOrder
-      fetchedArticles = fetchedArticles.sort((a, b) => {
-        const dateA = new Date(a.publishedAt);
-        const dateB = new Date(b.publishedAt);
-        return sortOrder === "latest" ? dateB - dateA : dateA - dateB;
-      });
-
-      // Filter articles by query if not empty
-      if (query && query.trim() !== "") {
-        const queryLower = query.toLowerCase();
-        fetchedArticles = fetchedArticles.filter((article) =>
-          article.title?.toLowerCase().includes(queryLower)
-        );
-      }
-
-      setArticles(fetchedArticles);
+      const response = await fetchArticles(selectedTopic);
+      setArticles(arrangeArticles(response?.articles || []));
+      setNextCursor(response?.next || null);
     } catch (error) {
       console.error(error?.response?.data?.detail);
       setArticles([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await fetchArticles(selectedTopic, nextCursor);
+      setArticles((prevArticles) =>
+        arrangeArticles([...prevArticles, ...(response?.articles || [])])
+      );
+      setNextCursor(response?.next || null);
+    } catch (error) {
+      console.error(error.message || "Error loading more articles");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCheckLatestNews = async () => {
     if (selectedTopic === "All") return;
     try {
@@ -330,6 +351,20 @@ const Articles = ({ selectedTopic, sortOrder, query }) => {
               ))}
         </Box>
       )}
+      {!loading && nextCursor && (
+        <Box sx={{ display: "flex", justifyContent: "center", mt: 3 }}>
+          <Button
+            size="sm"
+            variant="outlined"
+            color="neutral"
+            loading={loadingMore}
+            onClick={handleLoadMore}
+            sx={{ borderRadius: (theme) => theme.radius.xs }}
+          >
+            Load More
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 };
@@ -11,9 +11,16 @@ const fetchTopics = async (email) => {
   }
 };
 
-const fetchArticles = async (topic) => {
+// Articles per page of /get-news-by-topic; more pages load on demand
+const ARTICLE_PAGE_LIMIT = 50;
+
+const fetchArticles = async (topic, cursor = null) => {
   try {
-    const response = await api.get(`/get-news-by-topic?topic=${topic}`);
+    // Keyset-paginated: one page per call; pass the returned `next` to load the following page
+    const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+    const response = await api.get(
+      `/get-news-by-topic?topic=${topic}&limit=${ARTICLE_PAGE_LIMIT}${cursorParam}`
+    );
     return response.data;
   } catch (error) {
     console.error(error);
@@ -68,9 +75,15 @@ const getReport = async (reportId, articleId) => {
   }
 };
 
-const getReportSummary = async (email) => {
+// Summaries per page of /fetch-report-summary; more pages load on demand
+const REPORT_SUMMARY_PAGE_LIMIT = 50;
+
+const getReportSummary = async (email, page = 1) => {
   try {
-    const response = await api.get(`/fetch-report-summary?email=${email}`);
+    // Offset-paginated: one page per call; `has_more` tells whether another page exists
+    const response = await api.get(
+      `/fetch-report-summary?email=${email}&page=${page}&page_size=${REPORT_SUMMARY_PAGE_LIMIT}`
+    );
     return response.data;
   } catch (error) {
     console.error(error);
@@ -78,10 +91,10 @@ const getReportSummary = async (email) => {
   }
 };
 
-const updateSettings = async (settings, articleId, reportId) => {
+const updateSettings = async (settings, articleId, reportId, email) => {
   try {
     const response = await api.put(
-      `/set-save?settings=${encodeURIComponent(settings)}&article_id=${encodeURIComponent(articleId)}&report_id=${encodeURIComponent(reportId)}`
+      `/set-save?settings=${encodeURIComponent(settings)}&article_id=${encodeURIComponent(articleId)}&report_id=${encodeURIComponent(reportId)}&email=${encodeURIComponent(email)}`
     );
     return response.data;
   } catch (error) {
@@ -90,9 +103,16 @@ const updateSettings = async (settings, articleId, reportId) => {
   }
 };
 
-const getFeed = async (email) => {
+// Posts per feed page; more pages load as the user scrolls
+const FEED_PAGE_LIMIT = 20;
+
+const getFeed = async (cursor = null) => {
   try {
-    const response = await api.get(`/get-published-reports`);
+    // Keyset-paginated: one page per call; pass the returned `next` to load the following page
+    const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+    const response = await api.get(
+      `/get-published-reports?limit=${FEED_PAGE_LIMIT}${cursorParam}`
+    );
     return response.data;
   } catch (error) {
     console.error(error);